@@ -0,0 +1,122 @@
+"""
+Memory benchmark for research sessions.
+
+Runs the memory-relevant part of a research session end to end both ways and
+compares the traced memory. Every passage is unique and arrives as a freshly
+decoded search response; both sides then render the draft findings and the
+quality sources once each.
+
+- copies: the previous pipeline. Passages are held as plain dicts, the state
+  is copied by model_dump, the findings are built by repeated concatenation
+  and the quality prompt embeds str(sources).
+- source store: the current pipeline. Passages are held as Findings over a
+  SourceStore that spills past the threshold, the findings are joined in one
+  pass and the quality prompt embeds format_sources(sources).
+
+Usage:
+    python benchmarks/bench_memory.py [iterations] [passage_kb] [spill_kb]
+"""
+
+import copy
+import random
+import sys
+import tracemalloc
+from kairon.records import Finding
+from kairon.source_store import SourceStore, format_sources
+
+WORDS = (
+    "qubit coherence error correction superconducting trapped ion photonic "
+    "gate fidelity decoherence cryogenic topological surface code logical "
+    "physical noise readout calibration entanglement algorithm hardware "
+    "scaling latency benchmark the a of in to and with for on by is are"
+).split()
+
+
+def make_passages(iterations: int, passage_kb: int):
+    """Simulate distinct search responses as the encoded bytes received."""
+    rng = random.Random(0)
+    passages = []
+    for i in range(iterations):
+        words = []
+        size = 0
+        while size < passage_kb * 1024:
+            word = rng.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+        text = f"Result {i}: " + " ".join(words)
+        passages.append((f"question focus {i}", text.encode("utf-8")))
+    return passages
+
+
+def run_copies(passages):
+    """Run a session the way the pipeline used to."""
+    gathered = []
+    for query, response in passages:
+        gathered.append({"query": query, "result": response.decode("utf-8")})
+    dumped = copy.deepcopy({"gathered_information": gathered})
+
+    findings = "Research Findings:\n\n"
+    for item in dumped["gathered_information"]:
+        findings += f"Query: {item['query']}\n"
+        findings += f"Result: {item['result']}\n\n"
+    del findings
+
+    quality_sources = str(gathered)
+    del quality_sources
+    return gathered, dumped
+
+
+def run_store(passages, spill_threshold: int):
+    """Run a session through a SourceStore holding references only."""
+    store = SourceStore(spill_threshold=spill_threshold)
+    gathered = [
+        Finding(store.intern(query), store.add(response.decode("utf-8")))
+        for query, response in passages
+    ]
+
+    parts = ["Research Findings:\n\n"]
+    for item in gathered:
+        parts.append(f"Query: {item['query']}\nResult: {item['result']}\n\n")
+    findings = "".join(parts)
+    del parts, findings
+
+    quality_sources = format_sources(gathered)
+    del quality_sources
+    return store, gathered
+
+
+def measure(fn, *args):
+    """Return (current, peak) traced bytes, retained after fn and at its peak."""
+    tracemalloc.start()
+    retained = fn(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(retained[0], SourceStore):
+        retained[0].close()
+    del retained
+    return current, peak
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    passage_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    spill_kb = int(sys.argv[3]) if len(sys.argv) > 3 else 1024
+    passages = make_passages(iterations, passage_kb)
+
+    print(
+        f"{iterations} unique passages of {passage_kb} KiB, "
+        f"{spill_kb} KiB spill threshold"
+    )
+    for name, fn, args in (
+        ("copies", run_copies, (passages,)),
+        ("source store", run_store, (passages, spill_kb * 1024)),
+    ):
+        current, peak = measure(fn, *args)
+        print(
+            f"{name:>14}: retained {current / 2**20:8.2f} MiB, "
+            f"peak {peak / 2**20:8.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Micro-benchmarks for prompt rendering and prefix caching.
+
+Times rendering the draft and quality prompts with ChatPromptTemplate against
+the precompiled prompts, then estimates the prompt tokens a prefix cache saves
+per step when the drafts of one answer go through every quality check.
+
+Usage:
+    python benchmarks/bench_prompts.py [repeats] [sources]
+"""
+
+import sys
+import timeit
+from unittest.mock import Mock
+from langchain.prompts import ChatPromptTemplate
+from kairon.draft_agent import DRAFTING_INSTRUCTIONS, DraftAgent
+from kairon.model_router import ModelRouter
+from kairon.prompt_cache import ContextCache, estimate_tokens
+from kairon.quality_agent import QualityAgent
+from kairon.records import Finding
+from kairon.source_store import format_sources
+
+
+class PrefixCache(ContextCache):
+    """Selects the shared-prefix prompt layout without calling a provider."""
+
+    caches_prefixes = True
+
+
+def bench(label: str, fn, repeats: int) -> None:
+    seconds = min(timeit.repeat(fn, number=repeats, repeat=3)) / repeats
+    print(f"  {label:<44}{seconds * 1e6:>12.1f} us")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    router = ModelRouter(llm_factory=lambda route: Mock())
+    draft_agent = DraftAgent(router=router)
+    quality_agent = QualityAgent(router=router)
+
+    passage = "Coherence times improved in superconducting qubits. " * 40
+    findings = [
+        Finding(f"What limits qubits? focus {i}", passage) for i in range(source_count)
+    ]
+    sources = [{"query": f.query, "result": f.result} for f in findings]
+    content = "Superconducting qubits are limited by decoherence. " * 60
+    formatted = draft_agent._format_information(findings)
+
+    print("rendering")
+    template = ChatPromptTemplate.from_messages(
+        [("human", DRAFTING_INSTRUCTIONS + "{input}")]
+    )
+    bench(
+        "draft: ChatPromptTemplate.format_messages",
+        lambda: template.format_messages(
+            input="Based on the following research findings, create a comprehensive "
+            f"answer to the question: q\n\n{formatted}\n\n"
+            "Please provide a well-structured, clear, and accurate response."
+        ),
+        repeats,
+    )
+    bench(
+        "draft: CompiledPrompt.render_parts",
+        lambda: draft_agent.draft_prompt.render_parts(question="q", findings=formatted),
+        repeats,
+    )
+    fact_template = ChatPromptTemplate.from_messages(
+        [
+            (
+                "human",
+                quality_agent.fact_check_prompt.render(
+                    content="{content}", sources="{sources}"
+                ),
+            )
+        ]
+    )
+    sources_text = format_sources(sources)
+    bench(
+        "fact check: ChatPromptTemplate.format_messages",
+        lambda: fact_template.format_messages(content=content, sources=sources_text),
+        repeats,
+    )
+    bench(
+        "fact check: CompiledPrompt.render_parts",
+        lambda: quality_agent.fact_check_prompt.render_parts(
+            content=content, sources=sources_text
+        ),
+        repeats,
+    )
+
+    # Every check of one draft, with and without a shared cached prefix
+    print(f"estimated prompt tokens per draft ({source_count} sources)")
+    values = {"content": content, "sources": sources_text}
+    shared = QualityAgent(router=router, context_cache=PrefixCache())
+    for step, prompt, cached_prompt in (
+        (
+            "quality.fact_check",
+            quality_agent.fact_check_prompt,
+            shared.fact_check_prompt,
+        ),
+        (
+            "quality.bias_check",
+            quality_agent.bias_check_prompt,
+            shared.bias_check_prompt,
+        ),
+        (
+            "quality.readability",
+            quality_agent.readability_prompt,
+            shared.readability_prompt,
+        ),
+    ):
+        uncached = estimate_tokens(prompt.render(**values))
+        prefix, suffix = cached_prompt.render_parts(**values)
+        print(
+            f"  {step:<24}{uncached:>8} sent uncached"
+            f"{estimate_tokens(suffix):>8} sent with cached prefix"
+        )
+    print(
+        "  shared sources prefix uploaded once per answer: "
+        f"{estimate_tokens(prefix)} tokens"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmarks for the pipeline state models.
+
+Times construction, copy and serialization of a research state at realistic
+source counts, comparing the previous representation (validated dict findings,
+a model_dump round trip into DraftState, stdlib json) with slotted findings,
+construction without re-validation and the fastest installed codec.
+
+Usage:
+    python benchmarks/bench_state.py [repeats] [passage_kb]
+"""
+
+import json
+import sys
+import timeit
+from kairon.draft_agent import DraftState
+from kairon.records import CODECS, Finding, checkpoint, dumps_json
+from kairon.research_agent import ResearchState
+
+SOURCE_COUNTS = (4, 16, 64)
+
+
+def make_findings(count: int, passage_kb: int):
+    passage = (
+        "Coherence times improved in superconducting qubits. " * 20 * passage_kb
+    )[: passage_kb * 1024]
+    return [(f"What limits qubits? focus {i}", passage) for i in range(count)]
+
+
+def bench(label: str, fn, repeats: int) -> None:
+    seconds = min(timeit.repeat(fn, number=repeats, repeat=3)) / repeats
+    print(f"  {label:<44}{seconds * 1e6:>12.1f} us")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    passage_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"codecs installed: {', '.join(sorted(CODECS))}")
+
+    for count in SOURCE_COUNTS:
+        findings = make_findings(count, passage_kb)
+        print(f"{count} sources of {passage_kb} KiB")
+
+        bench(
+            "construct: dict findings, validated",
+            lambda: ResearchState(
+                research_question="What limits qubits?",
+                gathered_information=[{"query": q, "result": r} for q, r in findings],
+            ),
+            repeats,
+        )
+        bench(
+            "construct: slotted findings",
+            lambda: ResearchState(
+                research_question="What limits qubits?",
+                gathered_information=[Finding(q, r) for q, r in findings],
+            ),
+            repeats,
+        )
+
+        old = ResearchState(
+            research_question="What limits qubits?",
+            gathered_information=[{"query": q, "result": r} for q, r in findings],
+        )
+        new = ResearchState(
+            research_question="What limits qubits?",
+            gathered_information=[Finding(q, r) for q, r in findings],
+        )
+        bench(
+            "copy: DraftState(model_dump())",
+            lambda: DraftState(research_state=old.model_dump(), current_draft="draft"),
+            repeats,
+        )
+        bench(
+            "copy: DraftState.model_construct",
+            lambda: DraftState.model_construct(
+                research_state=new, current_draft="draft"
+            ),
+            repeats,
+        )
+
+        bench(
+            "serialize: json.dumps(model_dump())",
+            lambda: json.dumps(old.model_dump()),
+            repeats,
+        )
+        bench("serialize: model_dump_json", lambda: new.model_dump_json(), repeats)
+        bench("serialize: dumps_json", lambda: dumps_json(new), repeats)
+        for codec in sorted(CODECS):
+            bench(
+                f"serialize: checkpoint ({codec})",
+                lambda: checkpoint(new, codec),
+                repeats,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Record a live pipeline run once, then replay it offline as a load test.
+
+Usage:
+    python benchmarks/replay_load.py record cassettes/quantum.jsonl.gz \
+        "What is new in quantum computing?"
+    python benchmarks/replay_load.py replay cassettes/quantum.jsonl.gz \
+        "What is new in quantum computing?" --runs 50 --concurrency 8 --realtime
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from kairon.replay import Cassette, cassette_orchestrator
+
+
+def percentile(values, q):
+    """Return the q-th percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def record(args):
+    cassette = Cassette(args.cassette, mode="record")
+    orchestrator = cassette_orchestrator(cassette)
+    start = time.perf_counter()
+    orchestrator.run_research(args.question, max_iterations=args.max_iterations)
+    cassette.save()
+    print(
+        f"Recorded {len(cassette.entries)} calls in {time.perf_counter() - start:.2f}s"
+    )
+    for name, stats in sorted(cassette.stats().items()):
+        print(
+            f"{name:<32} calls={stats['calls']:<4} "
+            f"prompt_tokens={stats['prompt_tokens']:<7} "
+            f"completion_tokens={stats['completion_tokens']:<7} "
+            f"seconds={stats['seconds']:.2f}"
+        )
+
+
+def replay(args):
+    def one_run(_):
+        # A fresh cassette per run so each run replays the recorded sequence
+        orchestrator = cassette_orchestrator(
+            Cassette(args.cassette, realtime=args.realtime)
+        )
+        start = time.perf_counter()
+        orchestrator.run_research(args.question, max_iterations=args.max_iterations)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(one_run, range(args.runs)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.runs} runs, concurrency {args.concurrency}, realtime={args.realtime}")
+    print(f"throughput {args.runs / elapsed:.2f} runs/s")
+    print(
+        f"latency mean {statistics.mean(latencies):.3f}s "
+        f"p50 {percentile(latencies, 0.5):.3f}s "
+        f"p95 {percentile(latencies, 0.95):.3f}s max {max(latencies):.3f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("cassette")
+    parser.add_argument("question")
+    parser.add_argument("--max-iterations", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--realtime", action="store_true", help="Sleep for each call's recorded latency"
+    )
+    args = parser.parse_args()
+    if args.mode == "record":
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == "__main__":
+    main()
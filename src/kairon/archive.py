@@ -0,0 +1,240 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from .quality_agent import QualityCheck
+from .records import dumps_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    question_key TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    fact_accuracy REAL NOT NULL,
+    readability_score REAL NOT NULL,
+    bias_detected INTEGER NOT NULL,
+    total_seconds REAL NOT NULL,
+    stages TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    drafts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_question_key ON runs (question_key, fact_accuracy);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_fact_accuracy ON runs (fact_accuracy);
+CREATE INDEX IF NOT EXISTS runs_total_seconds ON runs (total_seconds);
+"""
+
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(question, answer, sources)"
+)
+
+ORDERINGS = {
+    "newest": "created_at DESC",
+    "oldest": "created_at ASC",
+    "slowest": "total_seconds DESC",
+    "fastest": "total_seconds ASC",
+    "best": "fact_accuracy DESC",
+    "worst": "fact_accuracy ASC",
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ArchivedRun(BaseModel):
+    """A completed research run stored in the archive."""
+
+    id: int
+    question: str
+    answer: str
+    created_at: datetime
+    total_seconds: float
+    quality: QualityCheck
+    stage_seconds: Dict[str, float] = Field(default_factory=dict)
+    sources: List[Dict[str, Any]] = Field(default_factory=list)
+    drafts: List[str] = Field(default_factory=list)
+
+
+def question_key(question: str) -> str:
+    """Normalize a question so trivially different phrasings match."""
+    return _WHITESPACE_RE.sub(" ", question.strip().lower()).rstrip(" ?.!")
+
+
+def _fts_query(text: str) -> str:
+    """Quote each term so user text is never parsed as FTS syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+class RunArchive:
+    def __init__(self, path: str):
+        """
+        Open (or create) a local archive of research runs.
+
+        Runs are indexed by date, fact accuracy and latency, and full-text
+        indexed with SQLite FTS5 when available (plain LIKE matching otherwise).
+
+        Args:
+            path: SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.execute(FTS_SCHEMA)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                self.full_text = False
+
+    def record(
+        self,
+        question: str,
+        answer: str,
+        quality_check: QualityCheck,
+        sources: List[Dict[str, Any]],
+        drafts: List[str],
+        stage_seconds: Dict[str, float],
+        total_seconds: float,
+    ) -> int:
+        """
+        Store a completed run.
+
+        Returns:
+            int: The id of the archived run
+        """
+        sources_json = dumps_json(sources)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (question, question_key, answer, created_at, "
+                "fact_accuracy, readability_score, bias_detected, total_seconds, "
+                "stages, quality, sources, drafts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    question,
+                    question_key(question),
+                    answer,
+                    time.time(),
+                    quality_check.fact_accuracy,
+                    quality_check.readability_score,
+                    int(quality_check.bias_detected),
+                    total_seconds,
+                    dumps_json(stage_seconds),
+                    quality_check.model_dump_json(),
+                    sources_json,
+                    dumps_json(drafts),
+                ),
+            )
+            run_id = cursor.lastrowid
+            if self.full_text:
+                self._conn.execute(
+                    "INSERT INTO runs_fts (rowid, question, answer, sources) "
+                    "VALUES (?, ?, ?, ?)",
+                    (run_id, question, answer, sources_json),
+                )
+        return run_id
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        min_seconds: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+        order_by: str = "newest",
+        limit: int = 20,
+    ) -> List[ArchivedRun]:
+        """
+        Query archived runs.
+
+        Args:
+            text: Terms matched against question, answer and sources
+            since: Only runs created at or after this time
+            until: Only runs created before this time
+            min_score: Minimum fact accuracy
+            max_score: Maximum fact accuracy
+            min_seconds: Minimum total latency
+            max_seconds: Maximum total latency
+            order_by: One of newest, oldest, slowest, fastest, best or worst
+            limit: Maximum number of runs returned
+
+        Returns:
+            List[ArchivedRun]: Matching runs
+        """
+        if order_by not in ORDERINGS:
+            raise ValueError(f"order_by must be one of {', '.join(ORDERINGS)}")
+
+        clauses, params = [], []
+        if text:
+            if self.full_text:
+                clauses.append(
+                    "id IN (SELECT rowid FROM runs_fts WHERE runs_fts MATCH ?)"
+                )
+                params.append(_fts_query(text))
+            else:
+                for term in text.split():
+                    clauses.append(
+                        "(question LIKE ? OR answer LIKE ? OR sources LIKE ?)"
+                    )
+                    params.extend([f"%{term}%"] * 3)
+        for clause, value in (
+            ("created_at >= ?", since.timestamp() if since else None),
+            ("created_at < ?", until.timestamp() if until else None),
+            ("fact_accuracy >= ?", min_score),
+            ("fact_accuracy <= ?", max_score),
+            ("total_seconds >= ?", min_seconds),
+            ("total_seconds <= ?", max_seconds),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT * FROM runs {where} ORDER BY {ORDERINGS[order_by]} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._to_run(row) for row in rows]
+
+    def find_answer(
+        self, question: str, min_score: float = 0.8, max_age: Optional[timedelta] = None
+    ) -> Optional[ArchivedRun]:
+        """Return the best prior run for the same question, if it scored well enough."""
+        query = (
+            "SELECT * FROM runs "
+            "WHERE question_key = ? AND fact_accuracy >= ? AND bias_detected = 0"
+        )
+        params: List[Any] = [question_key(question), min_score]
+        if max_age is not None:
+            query += " AND created_at >= ?"
+            params.append(time.time() - max_age.total_seconds())
+        query += " ORDER BY fact_accuracy DESC, created_at DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self._to_run(row) if row else None
+
+    def _to_run(self, row: sqlite3.Row) -> ArchivedRun:
+        return ArchivedRun(
+            id=row["id"],
+            question=row["question"],
+            answer=row["answer"],
+            created_at=datetime.fromtimestamp(row["created_at"]),
+            total_seconds=row["total_seconds"],
+            quality=QualityCheck.model_validate_json(row["quality"]),
+            stage_seconds=json.loads(row["stages"]),
+            sources=json.loads(row["sources"]),
+            drafts=json.loads(row["drafts"]),
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
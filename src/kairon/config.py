@@ -12,6 +12,60 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "kairon.log")
 
+# Model Routing Configuration
+DEFAULT_MODEL = os.getenv("KAIRON_DEFAULT_MODEL", "gemini-2.0-flash")
+DEFAULT_TEMPERATURE = float(os.getenv("KAIRON_DEFAULT_TEMPERATURE", "0.3"))
+# JSON mapping of "<agent>.<step>" (or "<agent>") to a fallback chain of models
+MODEL_ROUTES = os.getenv("KAIRON_MODEL_ROUTES", "")
+
+# Memory Configuration
+# Bytes of research passages kept in memory per job before spilling to disk
+SOURCE_SPILL_THRESHOLD = int(os.getenv("KAIRON_SOURCE_SPILL_THRESHOLD", str(8 * 1024 * 1024)))
+
+# Revision Configuration
+# Revisions per answer; the loop stops early once the quality score reaches the
+# target or a revision improves it by less than the epsilon
+REVISION_MAX = int(os.getenv("KAIRON_REVISION_MAX", "2"))
+REVISION_TARGET = float(os.getenv("KAIRON_REVISION_TARGET", "0.7"))
+REVISION_EPSILON = float(os.getenv("KAIRON_REVISION_EPSILON", "0.02"))
+
+# Research Configuration
+# Open gaps searched in parallel per iteration after the first
+RESEARCH_BREADTH = int(os.getenv("KAIRON_RESEARCH_BREADTH", "3"))
+# Upper bound on research agent calls per question, each of up to RESEARCH_MAX_STEPS
+# LLM steps with their searches
+RESEARCH_MAX_CALLS = int(os.getenv("KAIRON_RESEARCH_MAX_CALLS", "2"))
+# LLM steps one research agent call may take before it is stopped
+RESEARCH_MAX_STEPS = int(os.getenv("KAIRON_RESEARCH_MAX_STEPS", "4"))
+
+# Profiling Configuration
+# One of "stages", "cprofile" or "sampling"; profiling is off when unset
+PROFILE_MODE = os.getenv("KAIRON_PROFILE", "")
+PROFILE_DIR = os.getenv("KAIRON_PROFILE_DIR", "profiles")
+
+# Run Archive Configuration
+# SQLite file archiving completed runs; archiving is off when unset
+ARCHIVE_PATH = os.getenv("KAIRON_ARCHIVE", "")
+# Minimum fact accuracy for an archived answer to be reused for a repeat question
+ARCHIVE_REUSE_MIN_SCORE = float(os.getenv("KAIRON_ARCHIVE_REUSE_MIN_SCORE", "0.8"))
+# Seconds an archived answer stays reusable; 0 turns reuse off
+ARCHIVE_REUSE_MAX_AGE = float(os.getenv("KAIRON_ARCHIVE_REUSE_MAX_AGE", "86400"))
+
+# Distributed Configuration
+# Broker shared by distributed workers, e.g. sqlite:///queue.db or redis://host:6379/0
+QUEUE_URL = os.getenv("KAIRON_QUEUE_URL", "")
+# Calls per minute allowed across all workers; 0 disables the limit
+GEMINI_RATE_LIMIT = int(os.getenv("KAIRON_GEMINI_RATE_LIMIT", "0"))
+TAVILY_RATE_LIMIT = int(os.getenv("KAIRON_TAVILY_RATE_LIMIT", "0"))
+# Seconds shared search results and answers are reused across workers
+CACHE_TTL = float(os.getenv("KAIRON_CACHE_TTL", "3600"))
+
+# Prompt Cache Configuration
+# Provider-side caching of stable prompt prefixes: "" (off) or "gemini"
+PROMPT_CACHE = os.getenv("KAIRON_PROMPT_CACHE", "")
+# Seconds a cached prompt prefix is kept by the provider
+PROMPT_CACHE_TTL = float(os.getenv("KAIRON_PROMPT_CACHE_TTL", "300"))
+
 # Validate required environment variables
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable is not set")
@@ -0,0 +1,325 @@
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+from tavily import TavilyClient
+from .archive import question_key
+from .config import (
+    CACHE_TTL,
+    GEMINI_RATE_LIMIT,
+    QUEUE_URL,
+    TAVILY_API_KEY,
+    TAVILY_RATE_LIMIT,
+)
+from .model_router import ModelRouter
+from .orchestrator import ResearchOrchestrator
+from .quality_agent import QualityCheck
+from .queue_backend import QueueBackend, backend_from_url
+from .records import dumps, loads
+from .replay import request_key
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(RuntimeError):
+    """Raised by the client when a distributed job failed on its worker."""
+
+
+class GlobalRateLimiter:
+    def __init__(
+        self,
+        backend: QueueBackend,
+        limits: Dict[str, int],
+        window: float = 60.0,
+        poll_interval: float = 0.25,
+    ):
+        """
+        Initialize a rate limiter coordinated through the broker, so the limit
+        holds across every worker on every node.
+
+        Args:
+            backend: Broker shared by the workers
+            limits: Calls allowed per window, keyed by resource; 0 means unlimited
+            window: Window length in seconds
+            poll_interval: Longest sleep between attempts while throttled
+        """
+        self.backend = backend
+        self.limits = limits
+        self.window = window
+        self.poll_interval = poll_interval
+
+    def wait(self, resource: str) -> None:
+        """Block until a call to the resource is allowed."""
+        limit = self.limits.get(resource)
+        if not limit:
+            return
+        while not self.backend.acquire(resource, limit, self.window):
+            time.sleep(min(self.poll_interval, self.window - time.time() % self.window))
+
+
+class SharedSearchClient:
+    def __init__(
+        self,
+        inner: Any,
+        backend: QueueBackend,
+        limiter: Optional[GlobalRateLimiter] = None,
+        ttl: float = CACHE_TTL,
+    ):
+        """
+        Initialize a search client whose results are shared by all workers.
+
+        Args:
+            inner: Search client doing the actual searches, e.g. TavilyClient
+            backend: Broker holding the shared cache
+            limiter: Global rate limiter applied to uncached searches
+            ttl: Seconds a cached result is reused
+        """
+        self.inner = inner
+        self.backend = backend
+        self.limiter = limiter
+        self.ttl = ttl
+
+    def search(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        """Return a cached result from any worker, or search and share the result."""
+        key = "search:" + request_key(
+            "search", "tavily", {"query": query, "kwargs": kwargs}
+        )
+        cached = self.backend.cache_get(key)
+        if cached is not None:
+            return loads(cached)
+        if self.limiter is not None:
+            self.limiter.wait("tavily")
+        response = self.inner.search(query, **kwargs)
+        self.backend.cache_set(key, dumps(response), ttl=self.ttl)
+        return response
+
+
+def default_orchestrator(backend: QueueBackend) -> ResearchOrchestrator:
+    """Build an orchestrator whose Gemini and Tavily calls honour the global limits."""
+    limiter = GlobalRateLimiter(
+        backend, {"gemini": GEMINI_RATE_LIMIT, "tavily": TAVILY_RATE_LIMIT}
+    )
+    router = ModelRouter.from_config(limiter=lambda model: limiter.wait("gemini"))
+    search_client = SharedSearchClient(
+        TavilyClient(api_key=TAVILY_API_KEY), backend, limiter
+    )
+    return ResearchOrchestrator(router=router, search_client=search_client)
+
+
+class Worker:
+    def __init__(
+        self,
+        backend: QueueBackend,
+        orchestrator_factory: Callable[[QueueBackend], Any] = default_orchestrator,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 0.5,
+        answer_ttl: float = CACHE_TTL,
+    ):
+        """
+        Initialize a stateless worker pulling research jobs from the broker.
+
+        Each job runs the full research, draft and quality pipeline. Results
+        are written back to the broker and cached there, so a repeated question
+        with the same options is answered by any worker without running again.
+
+        Args:
+            backend: Broker shared by the workers
+            orchestrator_factory: Builds the orchestrator running the jobs
+            worker_id: Name recorded on claimed jobs (host:pid:suffix by default)
+            lease_seconds: Lease on a claimed job, renewed while it runs
+            poll_interval: Seconds to wait when the queue is empty
+            answer_ttl: Seconds a finished answer is reused
+        """
+        self.backend = backend
+        self.orchestrator = orchestrator_factory(backend)
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.answer_ttl = answer_ttl
+
+    def run(
+        self, max_jobs: Optional[int] = None, idle_timeout: Optional[float] = None
+    ) -> int:
+        """
+        Process jobs until max_jobs are done or the queue stays empty for idle_timeout.
+
+        Returns:
+            int: The number of jobs processed
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        while max_jobs is None or processed < max_jobs:
+            if self.run_once():
+                processed += 1
+                idle_since = time.monotonic()
+            elif (
+                idle_timeout is not None
+                and time.monotonic() - idle_since >= idle_timeout
+            ):
+                break
+            else:
+                time.sleep(self.poll_interval)
+        return processed
+
+    def run_once(self) -> bool:
+        """Claim and process one job; returns False if the queue was empty."""
+        claimed = self.backend.claim(self.worker_id, self.lease_seconds)
+        if claimed is None:
+            return False
+        job_id, payload = claimed
+        self._process(job_id, payload)
+        return True
+
+    def _process(self, job_id: str, payload: Dict[str, Any]) -> None:
+        question = payload["question"]
+        options = payload.get("options", {})
+        cache_key = "answer:" + request_key("answer", question_key(question), options)
+        cached = self.backend.cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Answering job {job_id} from the shared cache")
+            self._warn_if_lost(
+                job_id, self.backend.complete(job_id, self.worker_id, loads(cached))
+            )
+            return
+
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._renew, args=(job_id, done), daemon=True
+        )
+        heartbeat.start()
+        try:
+            answer, quality_check = self.orchestrator.run_research(question, **options)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self._warn_if_lost(
+                job_id, self.backend.fail(job_id, self.worker_id, str(e))
+            )
+            return
+        finally:
+            done.set()
+            heartbeat.join()
+
+        result = {
+            "answer": answer,
+            "quality": quality_check.model_dump(),
+            "worker": self.worker_id,
+        }
+        self.backend.cache_set(cache_key, dumps(result), ttl=self.answer_ttl)
+        self._warn_if_lost(
+            job_id, self.backend.complete(job_id, self.worker_id, result)
+        )
+
+    def _warn_if_lost(self, job_id: str, owned: bool) -> None:
+        """Log when another worker reclaimed the job, so this outcome was dropped."""
+        if not owned:
+            logger.warning(
+                f"Job {job_id} was reclaimed by another worker; dropping this outcome"
+            )
+
+    def _renew(self, job_id: str, done: threading.Event) -> None:
+        """Keep renewing a running job's lease so other workers leave it alone."""
+        while not done.wait(self.lease_seconds / 3):
+            if not self.backend.renew(job_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
+
+
+class DistributedClient:
+    def __init__(self, backend: QueueBackend, poll_interval: float = 0.5):
+        """
+        Initialize a client submitting research jobs to distributed workers.
+
+        Args:
+            backend: Broker shared with the workers
+            poll_interval: Seconds between checks while waiting for a result
+        """
+        self.backend = backend
+        self.poll_interval = poll_interval
+
+    def submit(self, question: str, **options: Any) -> str:
+        """
+        Queue a research question.
+
+        Args:
+            question: The research question to investigate
+            **options: JSON-serializable run_research options, e.g. quality_mode
+                or archive_max_age
+
+        Returns:
+            str: The job id
+        """
+        if not question or not isinstance(question, str):
+            raise ValueError("Question must be a non-empty string")
+        job_id = uuid.uuid4().hex
+        self.backend.enqueue(job_id, {"question": question, "options": options})
+        return job_id
+
+    def result(
+        self, job_id: str, timeout: Optional[float] = None
+    ) -> Tuple[str, QualityCheck]:
+        """
+        Wait for a job's answer and quality check.
+
+        Raises:
+            JobFailed: If the job failed on its worker
+            TimeoutError: If no result arrived within timeout seconds
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            status = self.backend.status(job_id)
+            if status is None:
+                raise ValueError(f"Unknown job: {job_id}")
+            if status["status"] == "done":
+                result = status["result"]
+                return result["answer"], QualityCheck.model_validate(result["quality"])
+            if status["status"] == "failed":
+                raise JobFailed(status["error"])
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+            time.sleep(self.poll_interval)
+
+    def run_research(
+        self, question: str, timeout: Optional[float] = None, **options: Any
+    ) -> Tuple[str, QualityCheck]:
+        """Submit a question and wait for its result."""
+        return self.result(self.submit(question, **options), timeout=timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a distributed Kairon research worker"
+    )
+    parser.add_argument(
+        "--queue", default=QUEUE_URL, help="Broker URL (defaults to KAIRON_QUEUE_URL)"
+    )
+    parser.add_argument(
+        "--max-jobs", type=int, default=None, help="Exit after this many jobs"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Exit after this many idle seconds",
+    )
+    args = parser.parse_args()
+    if not args.queue:
+        parser.error("a broker URL is required: pass --queue or set KAIRON_QUEUE_URL")
+
+    worker = Worker(backend_from_url(args.queue))
+    logger.info(f"Worker {worker.worker_id} polling {args.queue}")
+    try:
+        processed = worker.run(max_jobs=args.max_jobs, idle_timeout=args.idle_timeout)
+    finally:
+        worker.orchestrator.close()
+    logger.info(f"Worker {worker.worker_id} processed {processed} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
-from typing import List, Dict, Any
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, AIMessage
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from kairon.research_agent import ResearchState
-from .config import GOOGLE_API_KEY
+from .model_router import ModelRouter
+from .profiling import NULL_PROFILER, Profiler
+from .prompt_cache import CompiledPrompt, ContextCache
+
+DRAFTING_INSTRUCTIONS = """You are a drafting agent specialized in creating clear, concise, and well-structured content.
+            Your task is to:
+            1. Synthesize research findings into coherent narratives
+            2. Maintain accuracy and relevance to the original research question
+            3. Structure information logically
+            4. Use clear and professional language
+            
+            Always ensure your drafts are factually accurate and well-supported by the research.
+            
+            """
 
 class DraftState(BaseModel):
     """State for the drafting process."""
@@ -16,65 +26,67 @@ class DraftState(BaseModel):
         arbitrary_types_allowed = True
 
 class DraftAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        router: Optional[ModelRouter] = None,
+        profiler: Optional[Profiler] = None,
+        context_cache: Optional[ContextCache] = None
+    ):
         """Initialize the draft agent."""
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=GOOGLE_API_KEY,
-            temperature=0.3,
-            convert_system_message_to_human=True
-        )
-        
-        # Combine system and human messages into a single human message
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("human", """You are a drafting agent specialized in creating clear, concise, and well-structured content.
-            Your task is to:
-            1. Synthesize research findings into coherent narratives
-            2. Maintain accuracy and relevance to the original research question
-            3. Structure information logically
-            4. Use clear and professional language
-            
-            Always ensure your drafts are factually accurate and well-supported by the research.
-            
-            {input}"""),
-        ])
+        self.router = router or ModelRouter.from_config()
+        self.profiler = profiler or NULL_PROFILER
+        self.context_cache = context_cache or ContextCache()
         
-        self.chain = self.prompt | self.llm
+        # System instructions and the request are combined into a single human
+        # message, split into a stable prefix and a per-call suffix
+        self.draft_prompt = CompiledPrompt(
+            DRAFTING_INSTRUCTIONS + """Based on the following research findings, create a comprehensive answer to the question: {question}
+
+{findings}
+
+""",
+            "Please provide a well-structured, clear, and accurate response."
+        )
+        self.revise_prompt = CompiledPrompt(
+            DRAFTING_INSTRUCTIONS + """Please revise the following draft based on the provided feedback:
+
+Current Draft:
+{draft}
+
+""",
+            """Feedback:
+{feedback}
+
+Please provide an improved version of the draft that addresses the feedback while maintaining accuracy and clarity."""
+        )
     
     def _format_information(self, research_info: List[Dict[str, Any]]) -> str:
         """Format research information into a readable string."""
-        formatted = "Research Findings:\n\n"
+        parts = ["Research Findings:\n\n"]
         for item in research_info:
-            formatted += f"Query: {item['query']}\n"
-            formatted += f"Result: {item['result']}\n\n"
-        return formatted
+            parts.append(f"Query: {item['query']}\nResult: {item['result']}\n\n")
+        return "".join(parts)
     
     def draft_answer(self, research_state: ResearchState) -> str:
         """Create an initial draft based on research findings."""
         if not research_state.gathered_information:
             raise ValueError("No research information available to draft from")
         
-        formatted_info = self._format_information(research_state.gathered_information)
-        prompt = f"""Based on the following research findings, create a comprehensive answer to the question: {research_state.research_question}
-
-{formatted_info}
-
-Please provide a well-structured, clear, and accurate response."""
+        with self.profiler.stage("draft.prompt_format"):
+            prefix, suffix = self.draft_prompt.render_parts(
+                question=research_state.research_question,
+                findings=self._format_information(research_state.gathered_information)
+            )
         
-        response = self.chain.invoke({"input": prompt})
+        with self.profiler.stage("draft.llm"):
+            response = self.context_cache.invoke(self.router, "draft.draft", prefix, suffix)
         return response.content
     
     def revise_answer(self, current_draft: str, feedback: str) -> str:
         """Revise the current draft based on feedback."""
-        prompt = f"""Please revise the following draft based on the provided feedback:
-
-Current Draft:
-{current_draft}
-
-Feedback:
-{feedback}
-
-Please provide an improved version of the draft that addresses the feedback while maintaining accuracy and clarity."""
+        with self.profiler.stage("revise.prompt_format"):
+            prefix, suffix = self.revise_prompt.render_parts(draft=current_draft, feedback=feedback)
         
-        response = self.chain.invoke({"input": prompt})
-        return response.content 
\ No newline at end of file
+        with self.profiler.stage("revise.llm"):
+            response = self.context_cache.invoke(self.router, "draft.revise", prefix, suffix)
+        return response.content
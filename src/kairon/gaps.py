@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Optional, Set, Tuple
+from .local_checks import STOPWORDS
+
+# Base priorities by kind; open sub-questions are explored before stated gaps,
+# and both before entities that were merely mentioned.
+QUESTION_PRIORITY = 2.0
+GAP_PRIORITY = 1.5
+ENTITY_PRIORITY = 0.5
+
+# Phrases marking a sentence as describing missing or uncertain information.
+GAP_MARKERS = (
+    "unclear",
+    "unknown",
+    "not yet",
+    "further research",
+    "more research",
+    "remains to be",
+    "open question",
+    "needs further",
+    "little is known",
+    "not well understood",
+    "gap",
+)
+
+# At most this many gaps are taken from one result, and each is cut to
+# MAX_FOCUS_WORDS so follow-up queries stay searchable.
+MAX_GAPS_PER_RESULT = 10
+MAX_FOCUS_WORDS = 16
+
+# Short function words STOPWORDS leaves out; also never start an entity.
+FILLER_WORDS = STOPWORDS | frozenset(
+    {
+        "and",
+        "are",
+        "can",
+        "did",
+        "does",
+        "for",
+        "how",
+        "its",
+        "not",
+        "the",
+        "was",
+        "who",
+        "why",
+    }
+)
+
+# Words of the gap markers themselves, ignored when matching gaps so that
+# "X is unclear" and "X remains unknown" share a key and X alone answers both.
+MARKER_WORDS = frozenset(" ".join(GAP_MARKERS).split())
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_EMPHASIS_RE = re.compile(r"\*\*|__")
+# Sentences addressing the reader or speaking as the assistant ("Would you like
+# me to search further?") are chat, not open research questions.
+_CONVERSATIONAL_RE = re.compile(r"\b(?:you|your|yours|yourself|i|me|my|let's)\b", re.I)
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9'-]*")
+_ENTITY_RE = re.compile(
+    r"\b[A-Z][a-zA-Z0-9-]*(?:\s+[A-Z][a-zA-Z0-9-]*)+\b|\b[A-Z]{2,}[a-z]?\b"
+)
+
+
+@dataclass(order=True)
+class Gap:
+    """An open sub-question, stated gap or entity worth a follow-up search."""
+
+    sort_key: Tuple[float, int]
+    text: str = field(compare=False)
+    kind: str = field(compare=False)
+    priority: float = field(compare=False)
+    terms: FrozenSet[str] = field(compare=False)
+
+
+def gap_terms(text: str) -> FrozenSet[str]:
+    """Return the content terms of a text, used to dedupe gaps regardless of order."""
+    return frozenset(
+        term
+        for term in _TERM_RE.findall(text.lower())
+        if len(term) > 2 and term not in FILLER_WORDS and term not in MARKER_WORDS
+    )
+
+
+def _focus(sentence: str) -> str:
+    sentence = _EMPHASIS_RE.sub("", sentence)
+    words = sentence.strip().lstrip("-*•#>0123456789.) ").split()
+    return " ".join(words[:MAX_FOCUS_WORDS])
+
+
+def extract_gaps(text: str) -> List[Tuple[str, str, float]]:
+    """
+    Find what a research result leaves open, without an LLM call.
+
+    Args:
+        text: The research agent's output for one query
+
+    Returns:
+        List[Tuple[str, str, float]]: (focus text, kind, base priority) for each
+            sub-question, stated gap and entity mentioned more than once
+    """
+    found = []
+    for sentence in _SENTENCE_RE.split(text):
+        focus = _focus(sentence)
+        if not focus or _CONVERSATIONAL_RE.search(focus):
+            continue
+        if focus.endswith("?"):
+            found.append((focus, "question", QUESTION_PRIORITY))
+        elif any(marker in focus.lower() for marker in GAP_MARKERS):
+            found.append((focus, "gap", GAP_PRIORITY))
+
+    mentions: Counter = Counter()
+    for match in _ENTITY_RE.finditer(text):
+        words = match.group(0).split()
+        # Drop a capitalized sentence opener such as "Does" or "The"
+        while len(words) > 1 and words[0].lower() in FILLER_WORDS:
+            words.pop(0)
+        if len(words) > 1 or words[0].isupper():
+            mentions[" ".join(words)] += 1
+    for entity, count in mentions.most_common():
+        if count < 2:
+            break
+        found.append((entity, "entity", min(ENTITY_PRIORITY + 0.1 * (count - 1), 1.0)))
+    return found[:MAX_GAPS_PER_RESULT]
+
+
+class GapQueue:
+    def __init__(self, question: str):
+        """
+        Initialize a prioritized queue of research gaps for one question.
+
+        Gaps are deduped by their content terms against everything already
+        queued or asked, including the question itself, and against the
+        information gathered so far. Gaps sharing terms with the question are
+        boosted.
+
+        Args:
+            question: The research question being deepened
+        """
+        self.question = question
+        self._question_terms = gap_terms(question)
+        self._seen: Set[FrozenSet[str]] = set()
+        self._gathered: Set[str] = set()
+        self._heap: List[Gap] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, text: str, kind: str, priority: float) -> bool:
+        """Queue a gap unless the question, an earlier gap or a finding covers it."""
+        terms = gap_terms(text)
+        if (
+            not terms
+            or terms <= self._question_terms
+            or terms <= self._gathered
+            or terms in self._seen
+        ):
+            return False
+        self._seen.add(terms)
+        priority += len(terms & self._question_terms) / len(terms)
+        heapq.heappush(
+            self._heap,
+            Gap((-priority, next(self._sequence)), text, kind, priority, terms),
+        )
+        return True
+
+    def extend(self, text: str) -> int:
+        """
+        Add a research result to the gathered information and queue its open gaps.
+
+        Queued gaps whose terms the result covers count as answered and are
+        dropped; gaps the result raises that earlier findings already cover are
+        not queued.
+
+        Args:
+            text: The research agent's output for one query
+
+        Returns:
+            int: How many new gaps were queued
+        """
+        covered = gap_terms(text)
+        self._heap = [gap for gap in self._heap if not gap.terms <= covered]
+        heapq.heapify(self._heap)
+        added = sum(self.push(*gap) for gap in extract_gaps(text))
+        self._gathered |= covered
+        return added
+
+    def peek(self) -> Optional[Gap]:
+        """Return the most pressing gap without removing it."""
+        return self._heap[0] if self._heap else None
+
+    def pop(self, n: int = 1) -> List[Gap]:
+        """Remove and return up to n gaps, most pressing first."""
+        return [heapq.heappop(self._heap) for _ in range(min(n, len(self._heap)))]
+
+    def texts(self) -> List[str]:
+        """Return the queued gaps, most pressing first."""
+        return [gap.text for gap in sorted(self._heap)]
@@ -0,0 +1,235 @@
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set
+from pydantic import BaseModel, Field
+
+# Readability formulas are unreliable on very short samples, so anything
+# shorter than this is always escalated to the LLM checks.
+MIN_WORDS = 100
+
+# Normalized readability (Flesch reading ease / 100) inside this band is
+# treated as ambiguous and escalated.
+READABILITY_AMBIGUOUS_BAND = (0.3, 0.5)
+
+# Longer average sentences mean the sentences were not split properly, so the
+# readability formulas are not trusted and the check is escalated.
+MAX_WORDS_PER_SENTENCE = 40
+
+# Loaded terms that send a draft to the LLM bias check. Everyday intensifiers
+# ("always", "best", "clearly") are left out: they are common in neutral text.
+BIAS_LEXICON = frozenset(
+    {
+        "absurd",
+        "catastrophic",
+        "disastrous",
+        "everyone knows",
+        "extremist",
+        "idiotic",
+        "outrageous",
+        "propaganda",
+        "radical",
+        "regime",
+        "ridiculous",
+        "shocking",
+        "so-called",
+    }
+)
+
+STOPWORDS = frozenset(
+    {
+        "about",
+        "after",
+        "also",
+        "been",
+        "before",
+        "being",
+        "between",
+        "both",
+        "could",
+        "does",
+        "each",
+        "from",
+        "have",
+        "into",
+        "more",
+        "most",
+        "much",
+        "must",
+        "only",
+        "other",
+        "over",
+        "same",
+        "should",
+        "such",
+        "than",
+        "that",
+        "their",
+        "them",
+        "then",
+        "there",
+        "these",
+        "they",
+        "this",
+        "those",
+        "through",
+        "very",
+        "were",
+        "what",
+        "when",
+        "where",
+        "which",
+        "while",
+        "will",
+        "with",
+        "would",
+        "your",
+    }
+)
+
+_WORD_RE = re.compile(r"[a-z][a-z'-]*")
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+_ENDS_SENTENCE_RE = re.compile(r"[.!?]+[\"')\]]*\s*$")
+_MARKDOWN_BLOCK_RE = re.compile(r"^\s*(?:#{1,6}\s+|[-*+\u2022]\s+|\d+[.)]\s+|>\s*)")
+_EMPHASIS_RE = re.compile(r"\*\*|__|`")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+_BIAS_RE = re.compile(
+    r"\b("
+    + "|".join(sorted((re.escape(t) for t in BIAS_LEXICON), key=len, reverse=True))
+    + r")\b"
+)
+
+
+class LocalSignals(BaseModel):
+    """Quality signals computed locally, without any LLM call."""
+
+    word_count: int = 0
+    sentence_count: int = 0
+    flesch_reading_ease: float = 0.0
+    flesch_kincaid_grade: float = 0.0
+    readability_score: float = 0.0
+    source_coverage: float = 0.0
+    bias_hits: List[str] = Field(default_factory=list)
+
+
+def _syllables(word: str) -> int:
+    """Estimate the number of syllables in a lowercase word."""
+    count = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def _sentence_count(content: str) -> int:
+    """Count sentences, treating headings, list items and blank lines as boundaries.
+
+    Drafts are usually markdown, whose bullets and headings carry no final
+    punctuation; splitting only on ".!?" would merge a whole list into one
+    sentence.
+    """
+    count = 0
+    open_block = False
+    for line in content.splitlines():
+        marker = _MARKDOWN_BLOCK_RE.match(line)
+        text = _EMPHASIS_RE.sub("", line[marker.end() :] if marker else line)
+        if marker or not text.strip():
+            # A heading, list item or blank line ends any unpunctuated text
+            count += open_block
+            open_block = False
+        if not text.strip():
+            continue
+        count += len(_SENTENCE_END_RE.findall(text))
+        open_block = not _ENDS_SENTENCE_RE.search(text)
+        if marker:
+            count += open_block
+            open_block = False
+    return max(count + open_block, 1)
+
+
+def _vocabulary(text: str) -> Set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def source_text(sources: List[Dict[str, Any]]) -> str:
+    """Join the textual values of the sources."""
+    return " ".join(str(value) for item in sources for value in item.values())
+
+
+def source_vocabulary(sources: List[Dict[str, Any]]) -> Set[str]:
+    """Return the lowercase vocabulary of the textual values of the sources."""
+    return _vocabulary(source_text(sources))
+
+
+def analyze_content(content: str, sources: List[Dict[str, Any]]) -> LocalSignals:
+    """Compute readability, source coverage and bias lexicon hits for a draft."""
+    return analyze_text(content, source_text(sources))
+
+
+def analyze_text(content: str, sources_text: str) -> LocalSignals:
+    """Compute the local signals for a draft against already joined source text.
+
+    Work is done over the unique vocabulary rather than per token: syllables are
+    counted once per distinct word and weighted by frequency, and coverage is a
+    single set intersection against the source vocabulary.
+    """
+    text = content.lower()
+    counts = Counter(_WORD_RE.findall(text))
+    words = sum(counts.values())
+    signals = LocalSignals(word_count=words)
+    if not words:
+        return signals
+
+    sentences = _sentence_count(content)
+    syllables = sum(_syllables(word) * n for word, n in counts.items())
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+
+    signals.sentence_count = sentences
+    signals.flesch_reading_ease = (
+        206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    )
+    signals.flesch_kincaid_grade = (
+        0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    )
+    signals.readability_score = min(max(signals.flesch_reading_ease / 100.0, 0.0), 1.0)
+
+    terms = {word for word in counts if len(word) > 3 and word not in STOPWORDS}
+    if terms and sources_text:
+        signals.source_coverage = len(terms & _vocabulary(sources_text)) / len(terms)
+
+    signals.bias_hits = sorted(set(_BIAS_RE.findall(text)))
+    return signals
+
+
+def readability_verdict(signals: LocalSignals) -> Optional[float]:
+    """Return a readability score, or None if the LLM should decide."""
+    low, high = READABILITY_AMBIGUOUS_BAND
+    if signals.word_count < MIN_WORDS or low <= signals.readability_score <= high:
+        return None
+    if (
+        signals.sentence_count
+        and signals.word_count / signals.sentence_count > MAX_WORDS_PER_SENTENCE
+    ):
+        return None
+    return signals.readability_score
+
+
+def bias_verdict(signals: LocalSignals) -> Optional[bool]:
+    """Return False for a long draft without lexicon hits, else None for the LLM.
+
+    Lexicon hits only escalate: bias is never concluded locally.
+    """
+    if signals.word_count < MIN_WORDS or signals.bias_hits:
+        return None
+    return False
+
+
+def readability_suggestions(signals: LocalSignals) -> List[str]:
+    """Suggest readability improvements from the local metrics."""
+    suggestions = []
+    if signals.sentence_count and signals.word_count / signals.sentence_count > 25:
+        suggestions.append("Consider splitting long sentences to improve readability.")
+    if signals.flesch_kincaid_grade > 14:
+        suggestions.append(
+            "Consider simpler wording; the text reads above a college level."
+        )
+    return suggestions
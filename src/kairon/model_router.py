@@ -0,0 +1,223 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar, Union
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel
+from .config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, GOOGLE_API_KEY, MODEL_ROUTES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Steps routed by the agents, keyed as "<agent>.<step>".
+STEPS = (
+    "research.plan",
+    "draft.draft",
+    "draft.revise",
+    "quality.fact_check",
+    "quality.bias_check",
+    "quality.readability",
+    "quality.combined",
+)
+
+
+class ModelRoute(BaseModel):
+    """A model choice for a step, with an optional latency ceiling."""
+
+    model: str
+    temperature: float = DEFAULT_TEMPERATURE
+    max_p95: Optional[float] = None
+
+
+def gemini_factory(route: ModelRoute) -> ChatGoogleGenerativeAI:
+    """Create a Gemini chat model for a route."""
+    return ChatGoogleGenerativeAI(
+        model=route.model,
+        google_api_key=GOOGLE_API_KEY,
+        temperature=route.temperature,
+        convert_system_message_to_human=True,
+    )
+
+
+class _LimiterCallbackHandler(BaseCallbackHandler):
+    """Runs a limiter before every request a chat model sends, agent steps included."""
+
+    raise_error = True
+
+    def __init__(self, limiter: Callable[[str], None], model: str):
+        self.limiter = limiter
+        self.model = model
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self.limiter(self.model)
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        self.limiter(self.model)
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        routes: Optional[Dict[str, List[ModelRoute]]] = None,
+        default: Optional[List[ModelRoute]] = None,
+        llm_factory: Callable[[ModelRoute], Any] = gemini_factory,
+        latency_aware: bool = True,
+        window: int = 100,
+        min_samples: int = 5,
+        limiter: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Initialize the model router.
+
+        Args:
+            routes: Fallback chains keyed by "<agent>.<step>" or "<agent>"
+            default: Chain used for steps without a route
+            llm_factory: Callable creating a chat model for a route
+            latency_aware: Demote routes whose observed p95 exceeds max_p95
+            window: Number of recent latencies kept per model
+            min_samples: Observations needed before p95 is trusted
+            limiter: Called with the model name before every LLM request, e.g. to
+                wait for a global rate limit; an agent run counts once per request
+        """
+        self.routes = routes or {}
+        self.default = default or [ModelRoute(model=DEFAULT_MODEL)]
+        self.llm_factory = llm_factory
+        self.latency_aware = latency_aware
+        self.window = window
+        self.min_samples = min_samples
+        self.limiter = limiter
+        self._llms: Dict[tuple, Any] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, spec: Union[str, Dict[str, Any], None] = None, **kwargs: Any
+    ) -> "ModelRouter":
+        """
+        Build a router from a JSON route spec (defaults to KAIRON_MODEL_ROUTES).
+
+        Each key maps to a model name, or a list of model names or route
+        objects, e.g. {"quality": ["gemini-2.0-flash-lite", "gemini-2.0-flash"]}.
+        The special key "default" sets the chain for unrouted steps.
+        """
+        if spec is None:
+            spec = MODEL_ROUTES
+        if isinstance(spec, str):
+            spec = json.loads(spec) if spec.strip() else {}
+
+        routes = {}
+        for key, chain in spec.items():
+            if not isinstance(chain, list):
+                chain = [chain]
+            routes[key] = [
+                (
+                    ModelRoute(model=entry)
+                    if isinstance(entry, str)
+                    else ModelRoute(**entry)
+                )
+                for entry in chain
+            ]
+            if not routes[key]:
+                raise ValueError(f"Route '{key}' has an empty model chain")
+
+        default = routes.pop("default", None)
+        return cls(routes=routes, default=default, **kwargs)
+
+    def chain_for(self, step: str) -> List[ModelRoute]:
+        """Return the configured fallback chain for a step."""
+        if step in self.routes:
+            return self.routes[step]
+        agent = step.split(".", 1)[0]
+        return self.routes.get(agent, self.default)
+
+    def select(self, step: str) -> List[ModelRoute]:
+        """Return the chain for a step in the order it should be tried."""
+        chain = self.chain_for(step)
+        if not self.latency_aware:
+            return list(chain)
+
+        fast, slow = [], []
+        for route in chain:
+            p95 = self.p95(route.model)
+            too_slow = (
+                route.max_p95 is not None and p95 is not None and p95 > route.max_p95
+            )
+            (slow if too_slow else fast).append(route)
+        return fast + slow
+
+    def llm_for(self, route: ModelRoute) -> Any:
+        """Return the cached chat model for a route."""
+        key = (route.model, route.temperature)
+        with self._lock:
+            if key not in self._llms:
+                llm = self.llm_factory(route)
+                if self.limiter is not None:
+                    # On the model itself, so requests inside agents are limited too
+                    llm.callbacks = list(llm.callbacks or []) + [
+                        _LimiterCallbackHandler(self.limiter, route.model)
+                    ]
+                self._llms[key] = llm
+            return self._llms[key]
+
+    def primary_llm(self, step: str) -> Any:
+        """Return the chat model that would be tried first for a step."""
+        return self.llm_for(self.select(step)[0])
+
+    def call(self, step: str, fn: Callable[[Any], T]) -> T:
+        """
+        Run fn with the chat model chosen for a step, falling back down the chain.
+
+        Args:
+            step: The "<agent>.<step>" being executed
+            fn: Callable receiving a chat model and returning a result
+
+        Returns:
+            The result of the first route that succeeds
+        """
+        last_error: Optional[Exception] = None
+        for route in self.select(step):
+            llm = self.llm_for(route)
+            start = time.perf_counter()
+            try:
+                result = fn(llm)
+            except Exception as e:
+                logger.warning(f"Model {route.model} failed for {step}: {str(e)}")
+                last_error = e
+                continue
+            self.record_latency(route.model, time.perf_counter() - start)
+            return result
+        raise last_error
+
+    def invoke(self, step: str, messages: Any) -> Any:
+        """Invoke the chat model chosen for a step with the given messages."""
+        return self.call(step, lambda llm: llm.invoke(messages))
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        """Record an observed call latency for a model."""
+        with self._lock:
+            samples = self._latencies.setdefault(model, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def p95(self, model: str) -> Optional[float]:
+        """Return the observed p95 latency for a model, if enough samples exist."""
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(int(round(0.95 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
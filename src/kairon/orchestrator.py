@@ -1,10 +1,27 @@
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from langgraph.graph import Graph, END
 from .research_agent import ResearchAgent, ResearchState
 from .draft_agent import DraftAgent, DraftState
 from .quality_agent import QualityAgent, QualityCheck
+from .model_router import ModelRouter
+from .speculative import SpeculativeDrafter
+from .profiling import NULL_PROFILER, Profiler
+from .archive import RunArchive
+from .prompt_cache import ContextCache, context_cache_from_config
+from .source_store import SourceStore
+from .revision import RevisionPolicy, revise_until_converged
+from .config import (
+    ARCHIVE_PATH,
+    ARCHIVE_REUSE_MAX_AGE,
+    ARCHIVE_REUSE_MIN_SCORE,
+    PROFILE_DIR,
+    PROFILE_MODE,
+    SOURCE_SPILL_THRESHOLD,
+)
+from contextlib import contextmanager
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 # Configure logging
 logging.basicConfig(
@@ -18,11 +35,55 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ResearchOrchestrator:
-    def __init__(self):
-        """Initialize the research orchestrator with all agents."""
-        self.research_agent = ResearchAgent()
-        self.draft_agent = DraftAgent()
-        self.quality_agent = QualityAgent()
+    def __init__(
+        self,
+        router: Optional[ModelRouter] = None,
+        profiler: Optional[Profiler] = None,
+        search_client: Optional[Any] = None,
+        archive: Optional[RunArchive] = None,
+        revision_policy: Optional[RevisionPolicy] = None,
+        context_cache: Optional[ContextCache] = None
+    ):
+        """
+        Initialize the research orchestrator with all agents.
+        
+        Args:
+            router: Model router shared by all agents; built from
+                KAIRON_MODEL_ROUTES when omitted
+            profiler: Profiler shared by all agents; built from KAIRON_PROFILE
+                when omitted, and off when that is unset
+            search_client: Replacement for the Tavily client used by research
+            archive: Archive storing completed runs; opened from KAIRON_ARCHIVE
+                when omitted, and off when that is unset
+            revision_policy: Default revise-and-check loop settings; built from
+                the KAIRON_REVISION_* settings when omitted
+            context_cache: Cache shared by the draft and quality agents for
+                stable prompt prefixes; built from KAIRON_PROMPT_CACHE when omitted
+        """
+        self.router = router or ModelRouter.from_config()
+        if profiler is None and PROFILE_MODE:
+            profiler = Profiler(mode=PROFILE_MODE, output_dir=PROFILE_DIR)
+        self.profiler = profiler or NULL_PROFILER
+        if archive is None and ARCHIVE_PATH:
+            archive = RunArchive(ARCHIVE_PATH)
+        self.archive = archive
+        self.research_agent = ResearchAgent(
+            router=self.router,
+            profiler=self.profiler,
+            search_client=search_client
+        )
+        self.context_cache = context_cache or context_cache_from_config()
+        self.draft_agent = DraftAgent(
+            router=self.router,
+            profiler=self.profiler,
+            context_cache=self.context_cache
+        )
+        self.quality_agent = QualityAgent(
+            router=self.router,
+            profiler=self.profiler,
+            context_cache=self.context_cache
+        )
+        self.revision_policy = revision_policy or RevisionPolicy()
         logger.info("Initialized ResearchOrchestrator with all agents")
         
         # Define the workflow
@@ -55,20 +116,52 @@ class ResearchOrchestrator:
         return {"draft": draft, "research_state": state["research_state"]}
     
     def _revise_answer(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Revise the answer if needed."""
-        final_answer = self.draft_agent.revise_answer(
+        """Revise the answer while the quality checks show it is worth it."""
+        sources = state["research_state"].gathered_information
+        outcome = revise_until_converged(
             state["draft"],
-            "Please ensure the answer is clear, well-structured, and directly addresses the research question."
+            self.quality_agent.check_content(state["draft"], sources),
+            revise=self.draft_agent.revise_answer,
+            check=lambda draft: self.quality_agent.check_content(draft, sources),
+            policy=self.revision_policy
         )
-        return {"final_answer": final_answer}
+        return {"final_answer": outcome.draft, "quality_check": outcome.quality_check}
     
-    def run_research(self, question: str, max_iterations: int = 3) -> Tuple[str, QualityCheck]:
+    def run_research(
+        self,
+        question: str,
+        max_iterations: int = 3,
+        speculative: bool = False,
+        reuse_archived: bool = True,
+        archive_max_age: Optional[float] = None,
+        allow_revision: bool = True,
+        quality_mode: str = "full",
+        stage_timings: Optional[Dict[str, float]] = None,
+        revision_policy: Optional[RevisionPolicy] = None,
+        reports: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, QualityCheck]:
         """
         Run the complete research and drafting process with quality checks.
         
         Args:
             question: The research question to investigate
             max_iterations: Maximum number of research iterations
+            speculative: Start drafting from the first batch of findings while
+                research continues
+            reuse_archived: Answer from a prior archived run of the same question
+                when one scored at least KAIRON_ARCHIVE_REUSE_MIN_SCORE
+            archive_max_age: Seconds an archived answer stays reusable for this
+                run, overriding KAIRON_ARCHIVE_REUSE_MAX_AGE; 0 turns reuse off
+            allow_revision: Whether a draft failing the quality checks may be
+                revised; False is the same as a policy with max_revisions=0
+            quality_mode: "full" for one LLM call per quality check, "single"
+                for one combined call
+            stage_timings: If given, filled with the seconds spent in each stage,
+                plus research_iteration: research seconds per iteration actually run
+            revision_policy: Overrides the orchestrator's revision policy for this run
+            reports: If given, filled with this run's reports: revision, the
+                RevisionOutcome, and for speculative runs speculation, the
+                SpeculationReport
             
         Returns:
             Tuple[str, QualityCheck]: The final answer and quality check results
@@ -78,43 +171,154 @@ class ResearchOrchestrator:
         
         logger.info(f"Starting research process for question: {question}")
         
+        max_age = ARCHIVE_REUSE_MAX_AGE if archive_max_age is None else archive_max_age
+        if self.archive is not None and reuse_archived and max_age > 0:
+            prior = self.archive.find_answer(
+                question,
+                min_score=ARCHIVE_REUSE_MIN_SCORE,
+                max_age=timedelta(seconds=max_age)
+            )
+            if prior is not None:
+                logger.info(f"Answering from archived run {prior.id} with accuracy score: {prior.quality.fact_accuracy}")
+                return prior.answer, prior.quality
+        
+        policy = revision_policy or self.revision_policy
+        if not allow_revision:
+            policy = policy.model_copy(update={"max_revisions": 0})
+        
         try:
-            # Conduct research
-            research_state = self.research_agent.research(
-                question=question,
-                max_iterations=max_iterations
+            # The run owns the passage store; spilled passages are released with it
+            with self.profiler.run("run_research"), SourceStore(spill_threshold=SOURCE_SPILL_THRESHOLD) as store:
+                return self._run_stages(
+                    question,
+                    max_iterations,
+                    speculative,
+                    policy,
+                    quality_mode,
+                    {} if stage_timings is None else stage_timings,
+                    {} if reports is None else reports,
+                    store
+                )
+        except Exception as e:
+            logger.error(f"Error in research process: {str(e)}")
+            raise
+    
+    @contextmanager
+    def _stage(self, name: str, timings: Dict[str, float]) -> Iterator[None]:
+        """Time a pipeline stage for the run archive and the profiler."""
+        start = time.perf_counter()
+        with self.profiler.stage(name):
+            yield
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    
+    def _run_stages(
+        self,
+        question: str,
+        max_iterations: int,
+        speculative: bool,
+        revision_policy: RevisionPolicy,
+        quality_mode: str,
+        timings: Dict[str, float],
+        reports: Dict[str, Any],
+        store: SourceStore
+    ) -> Tuple[str, QualityCheck]:
+        """Run research, drafting, quality checks and revision, timing each stage."""
+        start = time.perf_counter()
+        drafts: List[str] = []
+
+        if speculative:
+            # Overlap drafting with the remaining research iterations
+            with self._stage("speculative", timings):
+                research_state, draft, report = SpeculativeDrafter(self.draft_agent).run(
+                    lambda on_iteration: self.research_agent.research(
+                        question=question,
+                        max_iterations=max_iterations,
+                        on_iteration=on_iteration,
+                        store=store
+                    )
+                )
+            reports["speculation"] = report
+            timings["research_iteration"] = report.research_seconds / max(research_state.iteration_count, 1)
+            logger.info(
+                f"Speculative draft ready ({report.final_action}) with "
+                f"{len(research_state.gathered_information)} sources, "
+                f"saved {report.saved_seconds:.2f}s over sequential"
             )
+        else:
+            # Conduct research
+            with self._stage("research", timings):
+                research_state = self.research_agent.research(
+                    question=question,
+                    max_iterations=max_iterations,
+                    store=store
+                )
+            timings["research_iteration"] = timings["research"] / max(research_state.iteration_count, 1)
             logger.info(f"Research completed with {len(research_state.gathered_information)} sources")
-            
+
             # Create initial draft
-            draft = self.draft_agent.draft_answer(research_state)
+            with self._stage("draft", timings):
+                draft = self.draft_agent.draft_answer(research_state)
             logger.info("Initial draft created")
-            
-            # Perform quality checks
-            quality_check = self.quality_agent.check_content(
-                content=draft,
-                sources=research_state.gathered_information
+        drafts.append(draft)
+
+        # Perform quality checks
+        def check(content: str) -> QualityCheck:
+            return self.quality_agent.check_content(
+                content=content,
+                sources=research_state.gathered_information,
+                mode=quality_mode
             )
-            logger.info(f"Quality check completed with accuracy score: {quality_check.fact_accuracy}")
-            
-            # Revise if necessary
-            if quality_check.fact_accuracy < 0.7 or quality_check.bias_detected:
-                logger.info("Revising draft based on quality check results")
-                feedback = "\n".join(quality_check.issues + quality_check.suggestions)
-                draft = self.draft_agent.revise_answer(draft, feedback)
-            
-            # Create final draft state
-            draft_state = DraftState(
-                research_state=research_state.model_dump(),
+
+        # Revisions and their re-checks are timed together as the revise stage
+        def revise(content: str, feedback: str) -> str:
+            logger.info("Revising draft based on quality check results")
+            with self._stage("revise", timings):
+                return self.draft_agent.revise_answer(content, feedback)
+
+        def recheck(content: str) -> QualityCheck:
+            with self._stage("revise", timings):
+                return check(content)
+
+        with self._stage("quality", timings):
+            quality_check = check(draft)
+        logger.info(f"Quality check completed with accuracy score: {quality_check.fact_accuracy}")
+
+        # Revise while it helps, keeping the best-scoring draft
+        outcome = revise_until_converged(draft, quality_check, revise, recheck, revision_policy)
+        drafts.extend(outcome.drafts)
+        draft, quality_check = outcome.draft, outcome.quality_check
+        reports["revision"] = outcome
+        if outcome.revisions:
+            logger.info(
+                f"Stopped after {outcome.revisions} revisions ({outcome.stop_reason}) "
+                f"with accuracy score: {quality_check.fact_accuracy}"
+            )
+
+        # Create final draft state from trusted parts, skipping re-validation
+        with self._stage("state_validation", timings):
+            draft_state = DraftState.model_construct(
+                research_state=research_state,
                 current_draft=draft
             )
-            
-            logger.info("Research process completed successfully")
-            return draft_state.current_draft, quality_check
-            
-        except Exception as e:
-            logger.error(f"Error in research process: {str(e)}")
-            raise
+
+        if self.archive is not None:
+            # The answer is already paid for; a failed write must not lose it
+            try:
+                run_id = self.archive.record(
+                    question=question,
+                    answer=draft_state.current_draft,
+                    quality_check=quality_check,
+                    sources=research_state.gathered_information,
+                    drafts=drafts,
+                    stage_seconds=timings,
+                    total_seconds=time.perf_counter() - start
+                )
+                logger.info(f"Archived run {run_id}")
+            except Exception as e:
+                logger.error(f"Failed to archive run: {str(e)}")
+
+        logger.info("Research process completed successfully")
+        return draft_state.current_draft, quality_check
     
     def revise_answer(self, current_draft: str, feedback: str) -> str:
         """
@@ -129,9 +333,14 @@ class ResearchOrchestrator:
         """
         logger.info("Revising answer based on feedback")
         return self.draft_agent.revise_answer(current_draft, feedback)
+    
+    def close(self) -> None:
+        """Release provider-side prompt caches held for this orchestrator's runs."""
+        self.context_cache.close()
 
 def main():
     # Example usage
+    orchestrator = None
     try:
         orchestrator = ResearchOrchestrator()
         question = "What are the latest developments in quantum computing?"
@@ -151,10 +360,15 @@ def main():
             print("\nSuggestions:")
             for suggestion in quality_check.suggestions:
                 print(f"- {suggestion}")
+        print("\nPrompt Tokens and Latency by Step:")
+        print(orchestrator.context_cache.format_report())
                 
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         raise
+    finally:
+        if orchestrator is not None:
+            orchestrator.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,259 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from pydantic import BaseModel
+
+MODES = ("stages", "cprofile", "sampling")
+
+
+class StageStats(BaseModel):
+    """Accumulated timings for a pipeline stage."""
+
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+    @property
+    def wait_seconds(self) -> float:
+        """Wall time not spent on this thread's CPU, e.g. network waits."""
+        return max(self.wall_seconds - self.cpu_seconds, 0.0)
+
+
+class NullProfiler:
+    """Profiler used when profiling is off; every hook is a no-op."""
+
+    enabled = False
+    _null = nullcontext()
+
+    def stage(self, name: str) -> nullcontext:
+        return self._null
+
+    def run(self, label: str = "run") -> nullcontext:
+        return self._null
+
+    def callbacks(self) -> List[BaseCallbackHandler]:
+        return []
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _StackSampler:
+    """Background thread sampling the Python stacks of all other threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample, name="kairon-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class _StageCallbackHandler(BaseCallbackHandler):
+    """Times LLM and tool calls made inside langchain runnables."""
+
+    def __init__(self, profiler: "Profiler"):
+        self.profiler = profiler
+        self._starts: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._starts[run_id] = ("llm", time.perf_counter())
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        self._starts[run_id] = ("llm", time.perf_counter())
+
+    def on_tool_start(
+        self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._starts[run_id] = ("tool", time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        kind, start = self._starts.pop(run_id, (None, None))
+        if kind is not None:
+            self.profiler.record(f"langchain.{kind}", time.perf_counter() - start)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(
+        self,
+        mode: str = "stages",
+        output_dir: Optional[str] = None,
+        sample_interval: float = 0.005,
+    ):
+        """
+        Initialize an opt-in profiler for pipeline runs.
+
+        Args:
+            mode: "stages" for wall/CPU time per stage only, "cprofile" to also
+                capture deterministic profiles, "sampling" to also capture
+                stack samples that can be dumped as collapsed stacks
+            output_dir: Directory where each run's profile is written, if set
+            sample_interval: Seconds between stack samples in sampling mode
+        """
+        if mode not in MODES:
+            raise ValueError(f"Profiling mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.stages: Dict[str, StageStats] = {}
+        self.profile: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, wall_seconds: float, cpu_seconds: float = 0.0) -> None:
+        """Add one observation to a stage."""
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.wall_seconds += wall_seconds
+            stats.cpu_seconds += cpu_seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block as a named stage, splitting wall and thread CPU time."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    @contextmanager
+    def run(self, label: str = "run") -> Iterator[None]:
+        """Profile a whole run, writing its profile to output_dir on exit."""
+        profile = cProfile.Profile() if self.mode == "cprofile" else None
+        sampler = (
+            _StackSampler(self.sample_interval) if self.mode == "sampling" else None
+        )
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another run on this process already holds the profiler hook
+                profile = None
+        if sampler is not None:
+            sampler.start()
+        try:
+            with self.stage(label):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    if self.profile is None:
+                        self.profile = pstats.Stats(profile)
+                    else:
+                        self.profile.add(profile)
+            if sampler is not None:
+                sampler.stop()
+                with self._lock:
+                    self.stacks.update(sampler.stacks)
+            if self.output_dir:
+                self.dump(label, profile, sampler)
+
+    def callbacks(self) -> List[BaseCallbackHandler]:
+        """Return langchain callbacks timing LLM and tool calls."""
+        return [_StageCallbackHandler(self)]
+
+    def dump(
+        self,
+        label: str,
+        profile: Optional[cProfile.Profile],
+        sampler: Optional[_StackSampler],
+    ) -> None:
+        """Write a run's stage report and profile output to output_dir."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(
+            self.output_dir, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        )
+        with open(f"{prefix}.stages.txt", "w") as f:
+            f.write(self.format_report())
+        if profile is not None:
+            profile.dump_stats(f"{prefix}.pstats")
+        if sampler is not None:
+            self.write_collapsed(f"{prefix}.collapsed", sampler.stacks)
+
+    def write_collapsed(self, path: str, stacks: Optional[Counter] = None) -> None:
+        """Write stack samples in collapsed format for flamegraph tools."""
+        stacks = self.stacks if stacks is None else stacks
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def report(self) -> Dict[str, StageStats]:
+        """Return a copy of the accumulated stage timings."""
+        with self._lock:
+            return {name: stats.model_copy() for name, stats in self.stages.items()}
+
+    def format_report(self) -> str:
+        """Render the stage timings as a table."""
+        lines = [f"{'stage':<32}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'wait s':>10}"]
+        for name, stats in sorted(self.report().items()):
+            lines.append(
+                f"{name:<32}{stats.calls:>7}{stats.wall_seconds:>10.3f}"
+                f"{stats.cpu_seconds:>10.3f}{stats.wait_seconds:>10.3f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.stages.clear()
+            self.stacks.clear()
+            self.profile = None
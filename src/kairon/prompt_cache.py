@@ -0,0 +1,385 @@
+import hashlib
+import importlib.util
+import logging
+import string
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+from .config import GOOGLE_API_KEY, PROMPT_CACHE, PROMPT_CACHE_TTL
+from .model_router import ModelRouter
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("", "gemini")
+
+# Gemini refuses context caches smaller than this many tokens.
+GEMINI_MIN_CACHE_TOKENS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used when the provider reports no usage."""
+    return max(len(text) // 4, 1)
+
+
+def _compile(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Parse a template once into (literal, field) segments."""
+    segments = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(
+                "Format specs and conversions are not supported in prompt fields: "
+                f"{field}"
+            )
+        segments.append((literal, field))
+    return tuple(segments)
+
+
+def _render(
+    segments: Tuple[Tuple[str, Optional[str]], ...], values: Dict[str, Any]
+) -> str:
+    parts = []
+    for literal, field in segments:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return "".join(parts)
+
+
+class CompiledPrompt:
+    """
+    A single-message prompt parsed once, split into a stable prefix and a
+    per-call suffix.
+
+    Rendering joins pre-split literals and values, which skips the template
+    parsing and validation ChatPromptTemplate repeats on every call. The prefix
+    holds what is shared across calls (instructions, content under review,
+    sources) so a context cache can keep it on the provider side.
+    """
+
+    __slots__ = ("prefix_template", "suffix_template", "_prefix", "_suffix")
+
+    def __init__(self, prefix: str, suffix: str = ""):
+        self.prefix_template = prefix
+        self.suffix_template = suffix
+        self._prefix = _compile(prefix)
+        self._suffix = _compile(suffix)
+
+    def render_parts(self, **values: Any) -> Tuple[str, str]:
+        """Render the prefix and suffix."""
+        return _render(self._prefix, values), _render(self._suffix, values)
+
+    def render(self, **values: Any) -> str:
+        """Render the whole prompt."""
+        return "".join(self.render_parts(**values))
+
+    def messages(self, **values: Any) -> List[HumanMessage]:
+        """Render the prompt as the single human message the agents send."""
+        return [HumanMessage(content=self.render(**values))]
+
+
+class PromptStats(BaseModel):
+    """Prompt tokens and LLM latency for one step, split by cache use."""
+
+    calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    seconds: float = 0.0
+    cached_seconds: float = 0.0
+
+    @property
+    def saved_tokens(self) -> int:
+        """Prompt tokens served from the provider cache instead of being resent."""
+        return self.cached_tokens
+
+    @property
+    def saved_seconds(self) -> float:
+        """Latency saved by cached calls against uncached calls of the same step."""
+        uncached = self.calls - self.cached_calls
+        if not uncached or not self.cached_calls:
+            return 0.0
+        per_call = (
+            self.seconds - self.cached_seconds
+        ) / uncached - self.cached_seconds / self.cached_calls
+        return max(per_call, 0.0) * self.cached_calls
+
+
+class ContextCache:
+    """
+    Sends each prompt to the routed model and accounts for its tokens and latency.
+
+    This base class caches nothing: every prompt is sent in full. Subclasses
+    keep stable prefixes on the provider side and send only the suffix.
+    """
+
+    caches_prefixes = False
+
+    def __init__(self):
+        self.stats: Dict[str, PromptStats] = {}
+        self._lock = threading.Lock()
+
+    def invoke(
+        self,
+        router: ModelRouter,
+        step: str,
+        prefix: str,
+        suffix: str = "",
+        reused: bool = False,
+    ) -> Any:
+        """
+        Invoke the model routed for a step with a prefix and suffix prompt.
+
+        Args:
+            router: Model router choosing the model
+            step: The "<agent>.<step>" being executed
+            prefix: Stable part of the prompt, shared with other calls
+            suffix: Call-specific rest of the prompt
+            reused: The caller will send the same prefix again, so it is worth
+                caching from the first call
+
+        Returns:
+            The model's response message
+        """
+        start = time.perf_counter()
+        response = router.invoke(step, [HumanMessage(content=prefix + suffix)])
+        self.record(
+            step, estimate_tokens(prefix + suffix), 0, time.perf_counter() - start
+        )
+        return response
+
+    def record(
+        self, step: str, prompt_tokens: int, cached_tokens: int, seconds: float
+    ) -> None:
+        """Add one call to a step's statistics."""
+        with self._lock:
+            stats = self.stats.setdefault(step, PromptStats())
+            stats.calls += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.seconds += seconds
+            if cached_tokens:
+                stats.cached_calls += 1
+                stats.cached_tokens += cached_tokens
+                stats.cached_seconds += seconds
+
+    def report(self) -> Dict[str, PromptStats]:
+        """Return a copy of the per-step statistics."""
+        with self._lock:
+            return {step: stats.model_copy() for step, stats in self.stats.items()}
+
+    def format_report(self) -> str:
+        """Render the per-step token and latency savings as a table."""
+        lines = [
+            f"{'step':<24}{'calls':>7}{'cached':>8}{'tokens':>10}"
+            f"{'saved tok':>11}{'llm s':>9}{'saved s':>9}"
+        ]
+        for step, stats in sorted(self.report().items()):
+            lines.append(
+                f"{step:<24}{stats.calls:>7}{stats.cached_calls:>8}"
+                f"{stats.prompt_tokens:>10}{stats.saved_tokens:>11}"
+                f"{stats.seconds:>9.2f}{stats.saved_seconds:>9.2f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        """Release provider-side caches."""
+
+
+def _sdk_create_cache(model: str, prefix: str, ttl: float) -> Any:
+    import google.generativeai as genai
+    from google.generativeai import caching
+
+    genai.configure(api_key=GOOGLE_API_KEY)
+    if not model.startswith("models/"):
+        model = f"models/{model}"
+    return caching.CachedContent.create(
+        model=model, contents=[prefix], ttl=timedelta(seconds=ttl)
+    )
+
+
+def _sdk_generate(
+    cache: Any, suffix: str, generation_config: Dict[str, Any]
+) -> Tuple[AIMessage, int, int]:
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+    response = model.generate_content(suffix, generation_config=generation_config)
+    usage = response.usage_metadata
+    return (
+        AIMessage(content=response.text),
+        usage.prompt_token_count,
+        usage.cached_content_token_count,
+    )
+
+
+def _generation_config(llm: Any) -> Dict[str, Any]:
+    """Return a routed chat model's sampling settings, for calls outside langchain."""
+    config = {}
+    for name in ("temperature", "top_p", "top_k", "max_output_tokens"):
+        value = getattr(llm, name, None)
+        if isinstance(value, (int, float)):
+            config[name] = value
+    return config
+
+
+class GeminiContextCache(ContextCache):
+    caches_prefixes = True
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        min_prefix_tokens: int = GEMINI_MIN_CACHE_TOKENS,
+        create_cache: Optional[Callable[[str, str, float], Any]] = None,
+        generate: Optional[
+            Callable[[Any, str, Dict[str, Any]], Tuple[AIMessage, int, int]]
+        ] = None,
+    ):
+        """
+        Initialize a context cache keeping prompt prefixes on Gemini.
+
+        A prefix (per model) is uploaded as a Gemini cached content once it is
+        known to be reused: on the first call flagged reused, otherwise on its
+        second call within ttl. Later calls send only the suffix until ttl
+        expires. One-off prefixes, prefixes below min_prefix_tokens and models
+        that cannot be cached are sent in full. A model whose upload failed is
+        not retried until ttl has passed.
+
+        Cached calls go through the Gemini SDK rather than the langchain model.
+        They use the routed model's temperature and sampling settings and the
+        router's limiter. Langchain callbacks and replay cassettes never see
+        them, so recorded and replayed runs use the uncached ContextCache.
+
+        Args:
+            ttl: Seconds a cached prefix is kept
+            min_prefix_tokens: Smallest estimated prefix worth caching
+            create_cache: Replaces the SDK call creating a cached content
+            generate: Replaces the SDK call generating from a cached content
+        """
+        super().__init__()
+        if (
+            create_cache is None
+            and importlib.util.find_spec("google.generativeai.caching") is None
+        ):
+            raise ImportError(
+                "GeminiContextCache requires google-generativeai>=0.7 "
+                "for context caching"
+            )
+        self.ttl = ttl
+        self.min_prefix_tokens = min_prefix_tokens
+        self.create_cache = create_cache or _sdk_create_cache
+        self.generate = generate or _sdk_generate
+        self._caches: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._seen: Dict[Tuple[str, str], float] = {}
+        self._failed: Dict[str, float] = {}
+
+    def _evict(self, now: float) -> None:
+        """Forget expired caches, sightings and upload failures."""
+        for key in [
+            key for key, (_, expires) in self._caches.items() if expires <= now
+        ]:
+            del self._caches[key]
+        for key in [key for key, expires in self._seen.items() if expires <= now]:
+            del self._seen[key]
+        for model in [
+            model for model, expires in self._failed.items() if expires <= now
+        ]:
+            del self._failed[model]
+
+    def _cache_for(self, model: str, prefix: str, reused: bool) -> Optional[Any]:
+        """Return a live cache for the prefix, creating it once the prefix is reused."""
+        key = (model, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            entry = self._caches.get(key)
+            if entry is not None:
+                return entry[0]
+            if model in self._failed:
+                return None
+            if not reused and self._seen.pop(key, None) is None:
+                self._seen[key] = now + self.ttl
+                return None
+
+        # Created outside the lock so other prompts are not held up by the upload
+        try:
+            cache = self.create_cache(model, prefix, self.ttl)
+        except Exception:
+            with self._lock:
+                self._failed[model] = time.monotonic() + self.ttl
+            raise
+        with self._lock:
+            # Renew slightly early so a call never lands on an expired cache
+            entry = self._caches.setdefault(
+                key, (cache, time.monotonic() + self.ttl * 0.9)
+            )
+        if entry[0] is not cache:
+            # Another call created the same cache first
+            self._delete(cache)
+        return entry[0]
+
+    @staticmethod
+    def _delete(cache: Any) -> None:
+        try:
+            cache.delete()
+        except Exception as e:
+            logger.warning(f"Failed to delete context cache: {str(e)}")
+
+    def invoke(
+        self,
+        router: ModelRouter,
+        step: str,
+        prefix: str,
+        suffix: str = "",
+        reused: bool = False,
+    ) -> Any:
+        if estimate_tokens(prefix) < self.min_prefix_tokens:
+            return super().invoke(router, step, prefix, suffix)
+
+        usage: Dict[str, int] = {}
+
+        def call(llm: Any) -> Any:
+            model = getattr(llm, "model", None)
+            try:
+                cache = self._cache_for(model, prefix, reused)
+            except Exception as e:
+                logger.warning(f"Context caching unavailable for {model}: {str(e)}")
+                cache = None
+            if cache is None:
+                usage["prompt"], usage["cached"] = estimate_tokens(prefix + suffix), 0
+                return llm.invoke([HumanMessage(content=prefix + suffix)])
+            # The SDK call bypasses the model's callbacks, so apply the limiter here
+            if router.limiter is not None:
+                router.limiter(model)
+            message, usage["prompt"], usage["cached"] = self.generate(
+                cache, suffix, _generation_config(llm)
+            )
+            return message
+
+        start = time.perf_counter()
+        response = router.call(step, call)
+        self.record(step, usage["prompt"], usage["cached"], time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            caches, self._caches = self._caches, {}
+            self._seen.clear()
+            self._failed.clear()
+        for cache, _ in caches.values():
+            self._delete(cache)
+
+
+def context_cache_from_config(
+    mode: Optional[str] = None, ttl: Optional[float] = None
+) -> ContextCache:
+    """Build the context cache selected by KAIRON_PROMPT_CACHE."""
+    mode = PROMPT_CACHE if mode is None else mode
+    if mode not in CACHE_MODES:
+        raise ValueError(
+            f"Prompt cache must be one of {', '.join(repr(m) for m in CACHE_MODES)}"
+        )
+    if mode == "gemini":
+        return GeminiContextCache(ttl=ttl or PROMPT_CACHE_TTL)
+    return ContextCache()
@@ -1,8 +1,25 @@
-from typing import List, Dict, Any
-from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+import re
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
-from .config import GOOGLE_API_KEY
+from .local_checks import (
+    analyze_text,
+    bias_verdict,
+    readability_suggestions,
+    readability_verdict,
+)
+from .model_router import ModelRouter
+from .profiling import NULL_PROFILER, Profiler
+from .prompt_cache import CompiledPrompt, ContextCache
+from .source_store import format_sources
+
+QUALITY_MODES = ("full", "single")
+
+SOURCES_PREFIX = """Research Sources: {sources}
+
+"""
+REVIEWED_CONTENT = """Content: {content}
+
+"""
 
 class QualityCheck(BaseModel):
     """Results of quality checks."""
@@ -10,103 +27,195 @@ class QualityCheck(BaseModel):
     consistency_score: float = 0.0
     bias_detected: bool = False
     readability_score: float = 0.0
+    source_coverage: Optional[float] = None
     issues: List[str] = Field(default_factory=list)
     suggestions: List[str] = Field(default_factory=list)
+    escalated_checks: List[str] = Field(default_factory=list)
 
-class QualityAgent:
-    def __init__(self):
-        """Initialize the quality control agent."""
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=GOOGLE_API_KEY,
-            temperature=0.3,
-            convert_system_message_to_human=True
-        )
-        
-        self.fact_check_prompt = ChatPromptTemplate.from_messages([
-            ("human", """Analyze the following content for factual accuracy and consistency:
+def extract_score(text: str) -> float:
+    """Extract a numerical score from the LLM response."""
+    # Look for a number between 0 and 1 in the text
+    match = re.search(r'(\d+\.?\d*)', text)
+    if match:
+        return min(max(float(match.group(1)), 0.0), 1.0)
+    return 0.5  # Default score if extraction fails
+
+def extract_labelled_score(text: str, label: str) -> float:
+    """Extract the score following a label such as "Accuracy:" in the LLM response."""
+    match = re.search(rf'{label}\s*:\s*(\d+\.?\d*)', text, re.IGNORECASE)
+    if match:
+        return min(max(float(match.group(1)), 0.0), 1.0)
+    return 0.5  # Default score if extraction fails
+
+def extract_bias(text: str) -> bool:
+    """Read the bias verdict from the "Bias:" line of a combined response."""
+    for line in text.lower().split('\n'):
+        if line.strip().startswith('bias'):
+            return "bias detected" in line and "no bias" not in line
+    return "bias detected" in text.lower() and "no bias" not in text.lower()
+
+def extract_issues(text: str) -> List[str]:
+    """Extract issues from the LLM response."""
+    return [
+        line.strip() for line in text.split('\n')
+        if any(keyword in line.lower() for keyword in ['issue', 'problem', 'inaccuracy', 'inconsistent'])
+    ]
+
+def extract_suggestions(text: str) -> List[str]:
+    """Extract suggestions from the LLM response."""
+    return [
+        line.strip() for line in text.split('\n')
+        if any(keyword in line.lower() for keyword in ['suggest', 'recommend', 'improve', 'consider'])
+    ]
+
+def parse_response(text: str, checks: List[str], combined: bool = False) -> Dict[str, Any]:
+    """
+    Read the results of the given checks from an LLM response.
+
+    Args:
+        text: The LLM response
+        checks: Checks answered by the response
+        combined: Whether the response follows the combined prompt's labelled format
 
-Content: {content}
+    Returns:
+        Dict[str, Any]: QualityCheck fields to set, plus issues and suggestions to add
+    """
+    results: Dict[str, Any] = {"issues": [], "suggestions": []}
+    if "fact_check" in checks:
+        results["fact_accuracy"] = extract_labelled_score(text, "accuracy") if combined else extract_score(text)
+        results["issues"] = extract_issues(text)
+    if "bias_check" in checks:
+        results["bias_detected"] = extract_bias(text) if combined else "bias detected" in text.lower()
+    if "readability" in checks:
+        results["readability_score"] = extract_labelled_score(text, "readability") if combined else extract_score(text)
+        results["suggestions"] = extract_suggestions(text)
+    return results
 
-Research Sources: {sources}
+class QualityAgent:
+    def __init__(
+        self,
+        use_local_checks: bool = True,
+        router: Optional[ModelRouter] = None,
+        profiler: Optional[Profiler] = None,
+        context_cache: Optional[ContextCache] = None
+    ):
+        """Initialize the quality control agent.
 
-Please identify any factual inaccuracies or inconsistencies and provide a confidence score (0-1) for the overall accuracy."""),
-        ])
+        Args:
+            use_local_checks: Screen drafts with local metrics first and only
+                call the LLM for checks whose local signals are ambiguous
+            router: Model router choosing the model for each check
+            profiler: Profiler timing prompt formatting and LLM calls
+            context_cache: Sends check prompts to the model, caching the shared
+                sources prefix when the cache supports it; uncached by default
+        """
+        self.use_local_checks = use_local_checks
+        self.router = router or ModelRouter.from_config()
+        self.profiler = profiler or NULL_PROFILER
+        
+        self.context_cache = context_cache or ContextCache()
         
-        self.bias_check_prompt = ChatPromptTemplate.from_messages([
-            ("human", """Analyze the following content for potential biases:
+        # The sources lead every prompt, then the content and check instructions
+        # follow, so every check of every draft and revision of one answer
+        # shares a cacheable prefix. Without a prefix cache, bias and
+        # readability skip the sources they don't need.
+        shared_prefix = SOURCES_PREFIX if self.context_cache.caches_prefixes else ""
+        self.fact_check_prompt = CompiledPrompt(SOURCES_PREFIX, REVIEWED_CONTENT + """Analyze the content above for factual accuracy and consistency with the research sources.
 
-Content: {content}
+Please identify any factual inaccuracies or inconsistencies and provide a confidence score (0-1) for the overall accuracy.""")
+        
+        self.bias_check_prompt = CompiledPrompt(shared_prefix, REVIEWED_CONTENT + """Analyze the content above for potential biases.
 
-Please identify any potential biases in language, perspective, or source selection."""),
-        ])
+Please identify any potential biases in language, perspective, or source selection.""")
         
-        self.readability_prompt = ChatPromptTemplate.from_messages([
-            ("human", """Evaluate the readability of the following content:
+        self.readability_prompt = CompiledPrompt(shared_prefix, REVIEWED_CONTENT + """Evaluate the readability of the content above.
 
-Content: {content}
+Please provide a readability score (0-1) and suggestions for improvement.""")
+        
+        self.combined_prompt = CompiledPrompt(SOURCES_PREFIX, REVIEWED_CONTENT + """Review the content above for factual accuracy, bias and readability.
 
-Please provide a readability score (0-1) and suggestions for improvement."""),
-        ])
+Answer with exactly these three lines, each followed by any issues or suggestions:
+Accuracy: <confidence score 0-1 for the overall factual accuracy>
+Bias: <"bias detected" or "no bias detected">
+Readability: <readability score 0-1>""")
     
-    def check_content(self, content: str, sources: List[Dict[str, Any]]) -> QualityCheck:
-        """Perform comprehensive quality checks on the content."""
+    def check_content(self, content: str, sources: List[Dict[str, Any]], mode: str = "full") -> QualityCheck:
+        """Perform comprehensive quality checks on the content.
+
+        Local signals can settle the bias and readability checks; the fact
+        check always goes to the LLM. In "single" mode every escalated check is
+        answered by one combined LLM call instead of one call per check.
+        """
+        if mode not in QUALITY_MODES:
+            raise ValueError(f"Quality mode must be one of {', '.join(QUALITY_MODES)}")
+        
         check = QualityCheck()
+        # Rendered once; local coverage and every check prompt read the same text
+        with self.profiler.stage("quality.prompt_format"):
+            sources_text = format_sources(sources)
+        with self.profiler.stage("quality.local_checks"):
+            signals = analyze_text(content, sources_text) if self.use_local_checks else None
+        bias_detected = bias_verdict(signals) if signals else None
+        readability_score = readability_verdict(signals) if signals else None
+        
+        if signals:
+            check.source_coverage = signals.source_coverage
+        if bias_detected is not None:
+            check.bias_detected = bias_detected
+        if readability_score is not None:
+            check.readability_score = readability_score
+            check.suggestions.extend(readability_suggestions(signals))
+        
+        # Word overlap with the sources can't tell a faithful draft from one
+        # recombining source words into wrong claims, so accuracy always goes
+        # to the LLM; source_coverage is kept only as a separate signal.
+        escalated = ["fact_check"] + [
+            name for name, verdict in (
+                ("bias_check", bias_detected),
+                ("readability", readability_score),
+            ) if verdict is None
+        ]
+        check.escalated_checks.extend(escalated)
+        
+        # The fact check is always escalated, so the sources are always sent
+        values = {"content": content, "sources": sources_text}
+        
+        if mode == "single":
+            combined = self._ask("quality.combined", self.combined_prompt, values)
+            self._apply(check, combined, escalated, combined=True)
+            return check
         
         # Check factual accuracy
-        fact_check = self.llm.invoke(
-            self.fact_check_prompt.format_messages(
-                content=content,
-                sources=str(sources)
-            )
-        )
-        check.fact_accuracy = self._extract_score(fact_check.content)
+        if "fact_check" in escalated:
+            fact_check = self._ask("quality.fact_check", self.fact_check_prompt, values)
+            self._apply(check, fact_check, ["fact_check"])
         
         # Check for biases
-        bias_check = self.llm.invoke(
-            self.bias_check_prompt.format_messages(content=content)
-        )
-        check.bias_detected = "bias detected" in bias_check.content.lower()
+        if "bias_check" in escalated:
+            bias_check = self._ask("quality.bias_check", self.bias_check_prompt, values)
+            self._apply(check, bias_check, ["bias_check"])
         
         # Check readability
-        readability_check = self.llm.invoke(
-            self.readability_prompt.format_messages(content=content)
-        )
-        check.readability_score = self._extract_score(readability_check.content)
-        
-        # Extract issues and suggestions
-        check.issues.extend(self._extract_issues(fact_check.content))
-        check.suggestions.extend(self._extract_suggestions(readability_check.content))
+        if "readability" in escalated:
+            readability_check = self._ask("quality.readability", self.readability_prompt, values)
+            self._apply(check, readability_check, ["readability"])
         
         return check
     
-    def _extract_score(self, text: str) -> float:
-        """Extract a numerical score from the LLM response."""
-        try:
-            # Look for a number between 0 and 1 in the text
-            import re
-            match = re.search(r'(\d+\.?\d*)', text)
-            if match:
-                score = float(match.group(1))
-                return min(max(score, 0.0), 1.0)
-        except:
-            pass
-        return 0.5  # Default score if extraction fails
-    
-    def _extract_issues(self, text: str) -> List[str]:
-        """Extract issues from the LLM response."""
-        issues = []
-        lines = text.split('\n')
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['issue', 'problem', 'inaccuracy', 'inconsistent']):
-                issues.append(line.strip())
-        return issues
+    def _ask(self, step: str, prompt: CompiledPrompt, values: Dict[str, str]) -> str:
+        """Render a check prompt and send it through the context cache."""
+        with self.profiler.stage("quality.prompt_format"):
+            prefix, suffix = prompt.render_parts(**values)
+        with self.profiler.stage("quality.llm"):
+            # Every check, draft and revision of an answer shares the sources prefix
+            response = self.context_cache.invoke(self.router, step, prefix, suffix, reused=True)
+        return response.content
     
-    def _extract_suggestions(self, text: str) -> List[str]:
-        """Extract suggestions from the LLM response."""
-        suggestions = []
-        lines = text.split('\n')
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['suggest', 'recommend', 'improve', 'consider']):
-                suggestions.append(line.strip())
-        return suggestions 
\ No newline at end of file
+    def _apply(self, check: QualityCheck, text: str, checks: List[str], combined: bool = False) -> None:
+        """Parse an LLM response and fold it into the check."""
+        with self.profiler.stage("quality.parse"):
+            results = parse_response(text, checks, combined)
+        check.issues.extend(results.pop("issues"))
+        check.suggestions.extend(results.pop("suggestions"))
+        for name, value in results.items():
+            setattr(check, name, value)
@@ -0,0 +1,453 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+from .records import dumps_json
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    resource TEXT NOT NULL,
+    window INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (resource, window)
+);
+"""
+
+# Redis scripts run atomically on the server, so no claim, requeue or finish
+# can interleave with another. Job hashes live under ARGV[1] .. ":job:" .. id.
+REDIS_CLAIM = """
+local now, lease, max_attempts = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local job_id = redis.call('RPOPLPUSH', KEYS[1], KEYS[2])
+if not job_id then
+    -- Return jobs whose lease ran out to the queue, or fail them after max_attempts
+    for _, id in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+        local key = ARGV[1] .. ':job:' .. id
+        local job = redis.call('HMGET', key, 'lease_until', 'attempts')
+        if tonumber(job[1] or '0') < now then
+            redis.call('LREM', KEYS[2], 1, id)
+            if tonumber(job[2] or '0') >= max_attempts then
+                redis.call('HSET', key, 'status', 'failed',
+                    'error', 'Lease expired too many times',
+                    'lease_until', 0, 'updated_at', ARGV[3])
+            else
+                redis.call('HSET', key, 'status', 'queued', 'updated_at', ARGV[3])
+                redis.call('RPUSH', KEYS[1], id)
+            end
+        end
+    end
+    job_id = redis.call('RPOPLPUSH', KEYS[1], KEYS[2])
+    if not job_id then
+        return false
+    end
+end
+local key = ARGV[1] .. ':job:' .. job_id
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', 'running', 'worker', ARGV[2],
+    'lease_until', now + lease, 'updated_at', ARGV[3])
+return {job_id, redis.call('HGET', key, 'payload')}
+"""
+
+REDIS_RENEW = """
+local job = redis.call('HMGET', KEYS[1], 'status', 'worker')
+if job[1] ~= 'running' or job[2] ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'lease_until', ARGV[2])
+return 1
+"""
+
+REDIS_FINISH = """
+local job = redis.call('HMGET', KEYS[1], 'status', 'worker')
+if job[1] ~= 'running' or job[2] ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', ARGV[3], ARGV[4], ARGV[5],
+    'lease_until', 0, 'updated_at', ARGV[6])
+redis.call('LREM', KEYS[2], 1, ARGV[2])
+return 1
+"""
+
+
+class QueueBackend(ABC):
+    """Broker shared by distributed workers: jobs, results, cache and rate limits."""
+
+    @abstractmethod
+    def enqueue(self, job_id: str, payload: Dict[str, Any]) -> None:
+        """Queue a job."""
+
+    @abstractmethod
+    def claim(
+        self, worker_id: str, lease_seconds: float
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Atomically take the oldest runnable job, if any.
+
+        Jobs whose worker stopped renewing its lease become runnable again, so
+        a crashed node never loses work.
+
+        Returns:
+            Optional[Tuple[str, Dict[str, Any]]]: The job id and payload
+        """
+
+    @abstractmethod
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a job the worker is still working on.
+
+        Returns:
+            bool: False if the job is no longer running on this worker
+        """
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store the result of a job running on the worker; False if it lost the job."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Mark a job running on the worker as failed; False if it lost the job."""
+
+    @abstractmethod
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's status, attempts, and result or error once finished."""
+
+    @abstractmethod
+    def cache_get(self, key: str) -> Optional[bytes]:
+        """Return a shared cache entry, if present and not expired."""
+
+    @abstractmethod
+    def cache_set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a shared cache entry."""
+
+    @abstractmethod
+    def acquire(self, resource: str, limit: int, window: float) -> bool:
+        """Take one of limit slots for a resource in this window, across all nodes."""
+
+    def close(self) -> None:
+        """Release the connection to the broker."""
+
+
+class SQLiteBackend(QueueBackend):
+    def __init__(self, path: str, max_attempts: int = 3):
+        """
+        Initialize a broker in a local SQLite file.
+
+        Meant for tests and single-machine deployments: every worker process
+        on the box opens the same file.
+
+        Args:
+            path: SQLite database file shared by the workers
+            max_attempts: Claims of a job before an expired lease marks it failed
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        # Transactions are managed explicitly so claims can take the write lock up front
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def _write(self, fn: Any) -> Any:
+        """Run fn inside an immediate (write-locked) transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, job_id: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        self._write(
+            lambda conn: conn.execute(
+                "INSERT INTO jobs (id, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, dumps_json(payload), now, now),
+            )
+        )
+
+    def claim(
+        self, worker_id: str, lease_seconds: float
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        def take(conn: sqlite3.Connection) -> Optional[Tuple[str, Dict[str, Any]]]:
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', "
+                "error = 'Lease expired too many times', updated_at = ? "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, "
+                "attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+            return row["id"], json.loads(row["payload"])
+
+        return self._write(take)
+
+    def _update_owned(self, assignments: str, params: Tuple[Any, ...]) -> bool:
+        """Update a job still running on a worker; params end with job and worker id."""
+        sql = (
+            f"UPDATE jobs SET {assignments} "
+            "WHERE id = ? AND worker = ? AND status = 'running'"
+        )
+        return self._write(lambda conn: conn.execute(sql, params).rowcount == 1)
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return self._update_owned(
+            "lease_until = ?", (time.time() + lease_seconds, job_id, worker_id)
+        )
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._update_owned(
+            "status = 'done', result = ?, lease_until = NULL, updated_at = ?",
+            (dumps_json(result), time.time(), job_id, worker_id),
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._update_owned(
+            "status = 'failed', error = ?, lease_until = NULL, updated_at = ?",
+            (error, time.time(), job_id, worker_id),
+        )
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, worker, attempts, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "status": row["status"],
+            "worker": row["worker"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+
+    def cache_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache "
+                "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return bytes(row["value"]) if row else None
+
+    def cache_set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._write(
+            lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+        )
+
+    def acquire(self, resource: str, limit: int, window: float) -> bool:
+        def take(conn: sqlite3.Connection) -> bool:
+            current = int(time.time() // window)
+            conn.execute(
+                "DELETE FROM rate_limits WHERE resource = ? AND window < ?",
+                (resource, current),
+            )
+            row = conn.execute(
+                "SELECT count FROM rate_limits WHERE resource = ? AND window = ?",
+                (resource, current),
+            ).fetchone()
+            if row is not None and row["count"] >= limit:
+                return False
+            conn.execute(
+                "INSERT INTO rate_limits (resource, window, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (resource, window) DO UPDATE SET count = count + 1",
+                (resource, current),
+            )
+            return True
+
+        return self._write(take)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(QueueBackend):
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client: Optional[Any] = None,
+        prefix: str = "kairon",
+        max_attempts: int = 3,
+    ):
+        """
+        Initialize a broker on Redis or any server speaking its protocol.
+
+        Claims, requeues of expired leases and job completion run as Lua
+        scripts, so the server must support EVAL.
+
+        Args:
+            url: Server URL, used when no client is given
+            client: Existing redis.Redis-compatible client
+            prefix: Namespace for all keys
+            max_attempts: Claims of a job before an expired lease marks it failed
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError(
+                    "RedisBackend requires the redis package: pip install redis"
+                )
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self._queue = f"{prefix}:queue"
+        self._processing = f"{prefix}:processing"
+        self._claim = client.register_script(REDIS_CLAIM)
+        self._renew = client.register_script(REDIS_RENEW)
+        self._finish = client.register_script(REDIS_FINISH)
+
+    def _job(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    @staticmethod
+    def _text(value: Any) -> Optional[str]:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def enqueue(self, job_id: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        self.client.hset(
+            self._job(job_id),
+            mapping={
+                "payload": dumps_json(payload),
+                "status": "queued",
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        self.client.lpush(self._queue, job_id)
+
+    def claim(
+        self, worker_id: str, lease_seconds: float
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        claimed = self._claim(
+            keys=[self._queue, self._processing],
+            args=[
+                self.prefix,
+                worker_id,
+                time.time(),
+                lease_seconds,
+                self.max_attempts,
+            ],
+        )
+        if not claimed:
+            return None
+        return self._text(claimed[0]), json.loads(self._text(claimed[1]))
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return bool(
+            self._renew(
+                keys=[self._job(job_id)], args=[worker_id, time.time() + lease_seconds]
+            )
+        )
+
+    def _finish_job(
+        self, job_id: str, worker_id: str, status: str, field: str, value: str
+    ) -> bool:
+        return bool(
+            self._finish(
+                keys=[self._job(job_id), self._processing],
+                args=[worker_id, job_id, status, field, value, time.time()],
+            )
+        )
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._finish_job(job_id, worker_id, "done", "result", dumps_json(result))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish_job(job_id, worker_id, "failed", "error", error)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = {
+            self._text(k): self._text(v)
+            for k, v in self.client.hgetall(self._job(job_id)).items()
+        }
+        if not job:
+            return None
+        return {
+            "status": job["status"],
+            "worker": job.get("worker"),
+            "attempts": int(job.get("attempts", 0)),
+            "result": json.loads(job["result"]) if job.get("result") else None,
+            "error": job.get("error"),
+        }
+
+    def cache_get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:cache:{key}")
+
+    def cache_set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(
+            f"{self.prefix}:cache:{key}",
+            value,
+            px=int(ttl * 1000) if ttl is not None else None,
+        )
+
+    def acquire(self, resource: str, limit: int, window: float) -> bool:
+        key = f"{self.prefix}:rate:{resource}:{int(time.time() // window)}"
+        count = self.client.incr(key)
+        if count == 1:
+            self.client.pexpire(key, int(window * 2000))
+        return count <= limit
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def backend_from_url(url: str) -> QueueBackend:
+    """Open a backend from a URL such as sqlite:///queue.db or redis://host:6379/0."""
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///") :])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported queue backend URL: {url}")
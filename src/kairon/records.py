@@ -0,0 +1,152 @@
+import json
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from pydantic import BaseModel
+from pydantic_core import core_schema
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+
+class Finding(Mapping):
+    """
+    One research finding: the query asked and the passage it returned.
+
+    A slotted, typed stand-in for the {"query": ..., "result": ...} dicts the
+    pipeline passes around. It reads like that dict, so formatting and local
+    checks work unchanged, but it costs a fraction of the memory and is never
+    re-validated. Pydantic models accept it as is and serialize it as a dict.
+
+    The passage may be kept spilled in a SourceStore, but it is always read
+    back, copied and pickled as a plain str.
+    """
+
+    __slots__ = ("query", "_result")
+    _keys = ("query", "result")
+
+    def __init__(self, query: str, result: Any):
+        self.query = query
+        self._result = result
+
+    @property
+    def result(self) -> str:
+        return str(self._result)
+
+    def __reduce__(self):
+        return (Finding, (self.query, self.result))
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "query":
+            return self.query
+        if key == "result":
+            return self.result
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return f"Finding(query={self.query!r}, result={self._result!r})"
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return a plain dict, materializing a spilled passage."""
+        return {"query": self.query, "result": self.result}
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: Any
+    ) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.to_dict),
+        )
+
+
+def _default(value: Any) -> Any:
+    """Encode values the serializers do not know natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, Finding):
+        return value.to_dict()
+    return str(value)
+
+
+def _codecs() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    codecs = {
+        "json": (
+            lambda obj: json.dumps(obj, default=_default, separators=(",", ":")).encode(
+                "utf-8"
+            ),
+            json.loads,
+        ),
+    }
+    if orjson is not None:
+        codecs["orjson"] = (
+            lambda obj: orjson.dumps(obj, default=_default),
+            orjson.loads,
+        )
+    if msgpack is not None:
+        codecs["msgpack"] = (
+            lambda obj: msgpack.packb(obj, default=_default),
+            msgpack.unpackb,
+        )
+    return codecs
+
+
+CODECS = _codecs()
+
+
+def fastest_codec(binary: bool = True) -> str:
+    """Name the fastest installed codec; binary=False restricts the choice to JSON."""
+    preferred = ("msgpack", "orjson", "json") if binary else ("orjson", "json")
+    return next(name for name in preferred if name in CODECS)
+
+
+def dumps(obj: Any, codec: Optional[str] = None) -> bytes:
+    """
+    Serialize a checkpoint or cache entry.
+
+    Args:
+        obj: Plain data, pydantic models or findings
+        codec: "msgpack", "orjson" or "json"; the fastest installed one by default
+
+    Returns:
+        bytes: The encoded value
+    """
+    codec = codec or fastest_codec()
+    if codec not in CODECS:
+        raise ValueError(f"Codec must be one of {', '.join(CODECS)}")
+    return CODECS[codec][0](obj)
+
+
+def loads(data: bytes, codec: Optional[str] = None) -> Any:
+    """Deserialize a value written by dumps with the same codec."""
+    codec = codec or fastest_codec()
+    if codec not in CODECS:
+        raise ValueError(f"Codec must be one of {', '.join(CODECS)}")
+    return CODECS[codec][1](data)
+
+
+def dumps_json(obj: Any) -> str:
+    """Serialize to JSON text, through orjson when it is installed."""
+    return dumps(obj, fastest_codec(binary=False)).decode("utf-8")
+
+
+def checkpoint(state: BaseModel, codec: Optional[str] = None) -> bytes:
+    """Serialize a state model for a checkpoint or cache."""
+    return dumps(state.model_dump(), codec)
+
+
+def restore(model: type, data: bytes, codec: Optional[str] = None) -> Any:
+    """Rebuild a state model from a checkpoint, validating it on the way in."""
+    return model.model_validate(loads(data, codec))
@@ -0,0 +1,271 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from tavily import TavilyClient
+from .config import TAVILY_API_KEY
+from .model_router import ModelRoute, ModelRouter, gemini_factory
+from .orchestrator import ResearchOrchestrator
+from .prompt_cache import ContextCache, estimate_tokens
+
+MODES = ("record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed request was never recorded."""
+
+
+def request_key(kind: str, name: str, payload: Any) -> str:
+    """Return a stable hash identifying a request."""
+    data = json.dumps([kind, name, payload], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", realtime: bool = False):
+        """
+        Initialize a cassette of recorded Gemini and Tavily traffic.
+
+        Entries are stored as gzip-compressed JSON lines holding the request
+        key, the prompt or query, the response, token counts and latency.
+
+        Args:
+            path: Cassette file, conventionally ending in .jsonl.gz
+            mode: "record" to capture live calls, "replay" to serve them offline
+            realtime: When replaying, sleep for each call's recorded latency
+        """
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self.entries: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def load(self) -> None:
+        """Read all entries from the cassette file."""
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+
+    def save(self) -> None:
+        """Write all recorded entries to the cassette file."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            entries = list(self.entries)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._by_key[entry["key"]].append(entry)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Add a recorded call."""
+        with self._lock:
+            self._index(entry)
+
+    def next(self, key: str) -> Dict[str, Any]:
+        """
+        Return the next recorded response for a request.
+
+        Repeated identical requests are served in recording order, cycling
+        back to the first once exhausted so a cassette can drive many runs.
+        """
+        with self._lock:
+            entries = self._by_key.get(key)
+            if not entries:
+                raise CassetteMiss(
+                    f"No recorded response for request {key[:12]} in {self.path}"
+                )
+            entry = entries[self._positions[key] % len(entries)]
+            self._positions[key] += 1
+        if self.realtime:
+            time.sleep(entry["latency"])
+        return entry
+
+    def llm_factory(
+        self, inner_factory: Callable[[ModelRoute], Any] = gemini_factory
+    ) -> Callable[[ModelRoute], "CassetteChatModel"]:
+        """Wrap a router LLM factory so every chat model goes through this cassette."""
+
+        def factory(route: ModelRoute) -> CassetteChatModel:
+            inner = inner_factory(route) if self.recording else None
+            return CassetteChatModel(cassette=self, model_name=route.model, inner=inner)
+
+        return factory
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Summarize recorded calls, tokens and latency per kind and model."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for entry in self.entries:
+            name = f"{entry['kind']}:{entry['name']}"
+            stats = summary.setdefault(
+                name,
+                {
+                    "calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "seconds": 0.0,
+                },
+            )
+            stats["calls"] += 1
+            stats["prompt_tokens"] += entry.get("usage", {}).get("prompt_tokens", 0)
+            stats["completion_tokens"] += entry.get("usage", {}).get(
+                "completion_tokens", 0
+            )
+            stats["seconds"] += entry["latency"]
+        return summary
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records calls to an inner model, or replays them."""
+
+    cassette: Any
+    model_name: str
+    inner: Optional[Any] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "kairon-cassette"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = [
+            {
+                "type": m.type,
+                "content": m.content,
+                "additional_kwargs": m.additional_kwargs,
+            }
+            for m in messages
+        ]
+        key = request_key(
+            "llm", self.model_name, {"messages": prompt, "stop": stop, "kwargs": kwargs}
+        )
+
+        if not self.cassette.recording:
+            entry = self.cassette.next(key)
+            message = AIMessage(**entry["response"])
+            return ChatResult(
+                generations=[ChatGeneration(message=message)],
+                llm_output={"token_usage": entry.get("usage", {}), "replayed": True},
+            )
+
+        start = time.perf_counter()
+        result = self.inner._generate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+        latency = time.perf_counter() - start
+
+        message = result.generations[0].message
+        usage = dict(
+            (result.llm_output or {}).get("token_usage")
+            or getattr(message, "usage_metadata", None)
+            or {}
+        )
+        if not usage:
+            prompt_text = "".join(str(m.content) for m in messages)
+            usage = {
+                "prompt_tokens": estimate_tokens(prompt_text),
+                "completion_tokens": estimate_tokens(str(message.content)),
+                "estimated": True,
+            }
+        self.cassette.append(
+            {
+                "kind": "llm",
+                "name": self.model_name,
+                "key": key,
+                "request": prompt,
+                "response": {
+                    "content": message.content,
+                    "additional_kwargs": message.additional_kwargs,
+                },
+                "usage": usage,
+                "latency": latency,
+            }
+        )
+        return result
+
+
+class CassetteSearchClient:
+    def __init__(self, cassette: Cassette, inner: Optional[Any] = None):
+        """
+        Initialize a Tavily stand-in backed by a cassette.
+
+        Args:
+            cassette: Cassette to record to or replay from
+            inner: Live TavilyClient, required when recording
+        """
+        if cassette.recording and inner is None:
+            raise ValueError("A live search client is required when recording")
+        self.cassette = cassette
+        self.inner = inner
+
+    def search(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        """Search through the live client, or replay the recorded response."""
+        key = request_key("search", "tavily", {"query": query, "kwargs": kwargs})
+        if not self.cassette.recording:
+            return self.cassette.next(key)["response"]
+
+        start = time.perf_counter()
+        response = self.inner.search(query, **kwargs)
+        self.cassette.append(
+            {
+                "kind": "search",
+                "name": "tavily",
+                "key": key,
+                "request": {"query": query, "kwargs": kwargs},
+                "response": response,
+                "latency": time.perf_counter() - start,
+            }
+        )
+        return response
+
+
+def cassette_orchestrator(cassette: Cassette, **kwargs: Any) -> ResearchOrchestrator:
+    """
+    Build an orchestrator whose Gemini and Tavily calls go through a cassette.
+
+    Args:
+        cassette: Cassette to record to or replay from
+        **kwargs: Extra ModelRouter.from_config arguments, e.g. a route spec
+
+    Returns:
+        ResearchOrchestrator: Orchestrator that is network-free when replaying
+    """
+    router = ModelRouter.from_config(llm_factory=cassette.llm_factory(), **kwargs)
+    inner = TavilyClient(api_key=TAVILY_API_KEY) if cassette.recording else None
+    # Provider-side prompt caching would bypass the cassette, so always send in full
+    return ResearchOrchestrator(
+        router=router,
+        search_client=CassetteSearchClient(cassette, inner=inner),
+        context_cache=ContextCache(),
+    )
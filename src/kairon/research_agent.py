@@ -1,36 +1,51 @@
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Union
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import Tool
 from langchain_core.messages import HumanMessage, AIMessage
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from tavily import TavilyClient
 import os
 from dotenv import load_dotenv
-from .config import GOOGLE_API_KEY
+from .config import RESEARCH_BREADTH, RESEARCH_MAX_CALLS, RESEARCH_MAX_STEPS
+from .gaps import GapQueue
+from .model_router import ModelRouter
+from .profiling import NULL_PROFILER, Profiler
+from .records import Finding
+from .source_store import SourceStore
 
 load_dotenv()
 
+# Output of an agent run stopped at its step limit before it summarized.
+AGENT_STOPPED_PREFIX = "Agent stopped due to"
+
 class ResearchState(BaseModel):
     """State for the research process."""
     research_question: str
-    gathered_information: List[Dict[str, Any]] = Field(default_factory=list)
+    gathered_information: List[Union[Finding, Dict[str, Any]]] = Field(default_factory=list)
     current_focus: str = ""
     iteration_count: int = 0
+    open_gaps: List[str] = Field(default_factory=list)
+    search_calls: int = 0
 
 class ResearchAgent:
-    def __init__(self):
-        """Initialize the research agent."""
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=GOOGLE_API_KEY,
-            temperature=0.3,
-            convert_system_message_to_human=True
-        )
+    def __init__(
+        self,
+        router: Optional[ModelRouter] = None,
+        profiler: Optional[Profiler] = None,
+        search_client: Optional[Any] = None
+    ):
+        """Initialize the research agent.
+
+        search_client replaces the Tavily client, e.g. with a replay cassette.
+        """
+        self.router = router or ModelRouter.from_config()
+        self.profiler = profiler or NULL_PROFILER
+        self.llm = self.router.primary_llm("research.plan")
         
         # Initialize Tavily client
-        self.tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        self.tavily_client = search_client or TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
         
         # Create a custom search function
         def tavily_search(query: str) -> str:
@@ -64,56 +79,110 @@ class ResearchAgent:
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
-        self.agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=self.prompt
-        )
-        
-        self.agent_executor = AgentExecutor(
-            agent=self.agent,
-            tools=self.tools,
-            verbose=True
-        )
+        self._executors: Dict[int, AgentExecutor] = {}
+        self.agent_executor = self._executor_for(self.llm)
+        self.agent = self.agent_executor.agent
     
-    def research(self, question: str, max_iterations: int = 3) -> ResearchState:
-        """Conduct research on a given question."""
+    def _executor_for(self, llm: Any) -> AgentExecutor:
+        """Return the agent executor driving the given chat model."""
+        if id(llm) not in self._executors:
+            agent = create_openai_functions_agent(
+                llm=llm,
+                tools=self.tools,
+                prompt=self.prompt
+            )
+            self._executors[id(llm)] = AgentExecutor(
+                agent=agent,
+                tools=self.tools,
+                verbose=True,
+                max_iterations=RESEARCH_MAX_STEPS,
+                return_intermediate_steps=True
+            )
+        return self._executors[id(llm)]
+    
+    def research(
+        self,
+        question: str,
+        max_iterations: int = 3,
+        on_iteration: Optional[Callable[[ResearchState], None]] = None,
+        breadth: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        store: Optional[SourceStore] = None
+    ) -> ResearchState:
+        """Conduct research on a given question.
+
+        The first iteration searches the question itself. Each later iteration
+        searches the most pressing open gaps left by earlier findings, up to
+        breadth of them in parallel, until no gaps remain, max_iterations is
+        reached or max_calls searches have been made.
+
+        on_iteration, if given, is called with the state after each batch of findings.
+        store holds the passages; it is owned, and closed, by the caller's run.
+        Without one, passages are deduplicated in memory and never spilled.
+        """
+        breadth = RESEARCH_BREADTH if breadth is None else breadth
+        max_calls = RESEARCH_MAX_CALLS if max_calls is None else max_calls
+        if breadth < 1 or max_calls < 1:
+            raise ValueError("breadth and max_calls must be at least 1")
+        
         state = ResearchState(research_question=question)
+        store = store or SourceStore(spill_threshold=None)
+        gaps = GapQueue(question)
+        focuses = [state.current_focus]
         
-        while state.iteration_count < max_iterations:
-            # Prepare the research query
-            query = f"{state.research_question} {state.current_focus}"
+        while focuses and state.iteration_count < max_iterations:
+            # Prepare the research queries, one per focus
+            queries = [f"{state.research_question} {focus}" for focus in focuses]
             
-            # Execute the research
-            result = self.agent_executor.invoke({
-                "input": query,
-                "chat_history": []
-            })
+            # Execute the research; independent follow-ups run in parallel
+            with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+                outputs = list(pool.map(self._search, queries))
+            state.search_calls += len(queries)
             
-            # Update state
-            state.gathered_information.append({
-                "query": query,
-                "result": result["output"]
-            })
+            # Update state, keeping one shared copy of each passage
+            for query, output in zip(queries, outputs):
+                state.gathered_information.append(Finding(store.intern(query), store.add(output)))
+            if on_iteration is not None:
+                on_iteration(state)
             
-            # Update focus for next iteration
-            state.current_focus = self._determine_next_focus(result["output"])
+            # Queue the gaps these findings leave open
+            for output in outputs:
+                self._determine_next_focus(output, gaps)
+            state.open_gaps = gaps.texts()
             state.iteration_count += 1
             
             # Check if we have sufficient information
             if self._has_sufficient_information(state):
                 break
+            
+            # Update focus for next iteration
+            focuses = [gap.text for gap in gaps.pop(min(breadth, max_calls - state.search_calls))]
+            state.current_focus = focuses[0] if focuses else ""
+            state.open_gaps = gaps.texts()
         
         return state
     
-    def _determine_next_focus(self, current_result: str) -> str:
-        """Determine what aspect to focus on next based on current results."""
-        # This is a simplified version - in practice, you'd want to analyze the results
-        # to identify gaps in information
-        return ""
+    def _search(self, query: str) -> str:
+        """Run the research agent on one query; callbacks split LLM and search time when profiling."""
+        with self.profiler.stage("research.executor"):
+            result = self.router.call(
+                "research.plan",
+                lambda llm: self._executor_for(llm).invoke(
+                    {"input": query, "chat_history": []},
+                    config={"callbacks": self.profiler.callbacks()}
+                )
+            )
+        output = result["output"]
+        if output.startswith(AGENT_STOPPED_PREFIX) and result.get("intermediate_steps"):
+            # Out of steps before summarizing; keep what the searches returned
+            output = "\n\n".join(str(observation) for _, observation in result["intermediate_steps"])
+        return output
+    
+    def _determine_next_focus(self, current_result: str, gaps: GapQueue) -> None:
+        """Queue the gaps a result leaves open, dropping those it answers."""
+        gaps.extend(current_result)
     
     def _has_sufficient_information(self, state: ResearchState) -> bool:
         """Determine if we have gathered sufficient information."""
-        # This is a simplified version - in practice, you'd want to analyze
-        # the quality and completeness of the gathered information
-        return len(state.gathered_information) >= 2 
\ No newline at end of file
+        # Research is complete once the findings leave no open gaps
+        return bool(state.gathered_information) and not state.open_gaps 
\ No newline at end of file
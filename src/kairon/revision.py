@@ -0,0 +1,100 @@
+import logging
+from typing import Callable, List
+from pydantic import BaseModel, Field
+from .config import REVISION_EPSILON, REVISION_MAX, REVISION_TARGET
+from .quality_agent import QualityCheck
+
+logger = logging.getLogger(__name__)
+
+# Subtracted from the accuracy score of a draft with detected bias, so a biased
+# draft never meets the target and always ranks below an unbiased one.
+BIAS_PENALTY = 0.5
+
+# Feedback used when the quality check names no specific issues.
+DEFAULT_FEEDBACK = (
+    "Please ensure the answer is clear, well-structured, "
+    "and directly addresses the research question."
+)
+
+
+class RevisionPolicy(BaseModel):
+    """When to keep revising a draft."""
+
+    max_revisions: int = Field(default=REVISION_MAX, ge=0)
+    target_score: float = REVISION_TARGET
+    epsilon: float = Field(default=REVISION_EPSILON, ge=0.0)
+
+
+class RevisionOutcome(BaseModel):
+    """The best draft found by the revision loop and how the loop ended."""
+
+    draft: str
+    quality_check: QualityCheck
+    revisions: int = 0
+    scores: List[float] = Field(default_factory=list)
+    drafts: List[str] = Field(default_factory=list)
+    stop_reason: str = ""
+
+
+def quality_score(check: QualityCheck) -> float:
+    """Score a quality check for ranking drafts."""
+    return check.fact_accuracy - (BIAS_PENALTY if check.bias_detected else 0.0)
+
+
+def feedback_for(check: QualityCheck) -> str:
+    """Turn a quality check into revision feedback."""
+    return "\n".join(check.issues + check.suggestions) or DEFAULT_FEEDBACK
+
+
+def revise_until_converged(
+    draft: str,
+    quality_check: QualityCheck,
+    revise: Callable[[str, str], str],
+    check: Callable[[str], QualityCheck],
+    policy: RevisionPolicy,
+) -> RevisionOutcome:
+    """
+    Revise and re-check a draft until it is good enough or stops improving.
+
+    The loop stops when the score reaches the policy's target, when a revision
+    improves the score by less than epsilon, or when max_revisions is spent.
+
+    Args:
+        draft: The initial draft
+        quality_check: Quality check of the initial draft
+        revise: Callable returning a revision of a draft given feedback
+        check: Callable returning the quality check of a draft
+        policy: Revision budget, target and convergence threshold
+
+    Returns:
+        RevisionOutcome: The best-scoring draft with its quality check
+    """
+    score = quality_score(quality_check)
+    outcome = RevisionOutcome(draft=draft, quality_check=quality_check, scores=[score])
+
+    current, current_check = draft, quality_check
+    while True:
+        if score >= policy.target_score:
+            outcome.stop_reason = "target"
+            break
+        if outcome.revisions >= policy.max_revisions:
+            outcome.stop_reason = "budget"
+            break
+
+        current = revise(current, feedback_for(current_check))
+        current_check = check(current)
+        outcome.revisions += 1
+        outcome.drafts.append(current)
+
+        previous, score = score, quality_score(current_check)
+        outcome.scores.append(score)
+        logger.info(
+            f"Revision {outcome.revisions} scored {score:.2f} (was {previous:.2f})"
+        )
+        if score > quality_score(outcome.quality_check):
+            outcome.draft, outcome.quality_check = current, current_check
+        if score < policy.target_score and score - previous < policy.epsilon:
+            outcome.stop_reason = "converged"
+            break
+
+    return outcome
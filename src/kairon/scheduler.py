@@ -0,0 +1,313 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .quality_agent import QualityCheck
+
+if TYPE_CHECKING:
+    from .orchestrator import ResearchOrchestrator
+
+logger = logging.getLogger(__name__)
+
+# Conservative starting estimates in seconds, refined from observed runs.
+DEFAULT_ESTIMATES = {
+    "research_iteration": 10.0,
+    "draft": 8.0,
+    "quality_full": 6.0,
+    "quality_single": 3.0,
+    "revise": 8.0,
+}
+
+
+class Priority(IntEnum):
+    """Priority classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class DegradationPlan(BaseModel):
+    """How much work a job may do to finish within its deadline."""
+
+    max_iterations: int
+    allow_revision: bool = True
+    quality_mode: str = "full"
+
+
+class SchedulerStats(BaseModel):
+    """Outcome and latency statistics for one priority class."""
+
+    completed: int = 0
+    failed: int = 0
+    degraded: int = 0
+    deadline_misses: int = 0
+    p95_seconds: Optional[float] = None
+
+
+@dataclass(order=True)
+class _Job:
+    sort_key: Tuple[int, float, int]
+    question: str = field(compare=False)
+    priority: Priority = field(compare=False)
+    deadline_at: Optional[float] = field(compare=False)
+    submitted_at: float = field(compare=False)
+    reuse_archived: bool = field(compare=False)
+    archive_max_age: Optional[float] = field(compare=False)
+    future: Future = field(compare=False)
+
+
+class ResearchScheduler:
+    def __init__(
+        self,
+        orchestrator: "ResearchOrchestrator",
+        workers: int = 4,
+        reserved_interactive: int = 1,
+        max_iterations: int = 3,
+        smoothing: float = 0.3,
+        estimates: Optional[Dict[str, float]] = None,
+        window: int = 200,
+    ):
+        """
+        Initialize a priority scheduler in front of the orchestrator.
+
+        Interactive jobs are always served before batch jobs, earliest deadline
+        first within a class, and reserved_interactive workers never pick up
+        batch work. Jobs with a deadline get a degradation plan sized from
+        smoothed observations of how long each stage takes.
+
+        Args:
+            orchestrator: Orchestrator running the jobs; must be safe to call
+                from several threads
+            workers: Number of jobs run concurrently
+            reserved_interactive: Workers kept free for interactive jobs
+            max_iterations: Research iterations for a job with no time pressure
+            smoothing: Weight of the newest observation in the stage estimates
+            estimates: Initial stage duration estimates in seconds
+            window: Number of recent latencies kept per priority class
+        """
+        if not 0 <= reserved_interactive < workers:
+            raise ValueError(
+                "reserved_interactive must leave at least one worker for batch jobs"
+            )
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.reserved_interactive = reserved_interactive
+        self.max_iterations = max_iterations
+        self.smoothing = smoothing
+        self.estimates = {**DEFAULT_ESTIMATES, **(estimates or {})}
+        self._stats = {priority: SchedulerStats() for priority in Priority}
+        self._latencies: Dict[Priority, Deque[float]] = {
+            priority: deque(maxlen=window) for priority in Priority
+        }
+        self._queue: List[_Job] = []
+        self._sequence = itertools.count()
+        self._running_batch = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"kairon-scheduler-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        question: str,
+        priority: Priority = Priority.BATCH,
+        deadline: Optional[float] = None,
+        reuse_archived: bool = True,
+        archive_max_age: Optional[float] = None,
+    ) -> "Future[Tuple[str, QualityCheck]]":
+        """
+        Queue a research question.
+
+        Args:
+            question: The research question to investigate
+            priority: Priority class of the job
+            deadline: Seconds from now by which the answer is wanted
+            reuse_archived: Whether an archived answer may be returned
+            archive_max_age: Seconds an archived answer stays reusable, overriding
+                KAIRON_ARCHIVE_REUSE_MAX_AGE; 0 turns reuse off
+
+        Returns:
+            Future resolving to the orchestrator's (answer, quality check)
+        """
+        if not question or not isinstance(question, str):
+            raise ValueError("Question must be a non-empty string")
+
+        now = time.monotonic()
+        deadline_at = now + deadline if deadline is not None else None
+        job = _Job(
+            sort_key=(
+                priority,
+                deadline_at if deadline_at is not None else float("inf"),
+                next(self._sequence),
+            ),
+            question=question,
+            priority=priority,
+            deadline_at=deadline_at,
+            submitted_at=now,
+            reuse_archived=reuse_archived,
+            archive_max_age=archive_max_age,
+            future=Future(),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            heapq.heappush(self._queue, job)
+            self._cond.notify_all()
+        return job.future
+
+    def plan(
+        self, deadline_at: Optional[float], now: Optional[float] = None
+    ) -> DegradationPlan:
+        """Choose the most complete plan expected to finish before the deadline."""
+        full = DegradationPlan(max_iterations=self.max_iterations)
+        if deadline_at is None:
+            return full
+
+        remaining = deadline_at - (time.monotonic() if now is None else now)
+        candidates = [
+            full,
+            DegradationPlan(max_iterations=self.max_iterations, allow_revision=False),
+        ] + [
+            DegradationPlan(
+                max_iterations=iterations, allow_revision=False, quality_mode="single"
+            )
+            for iterations in range(self.max_iterations, 0, -1)
+        ]
+        for candidate in candidates:
+            if self.estimate(candidate) <= remaining:
+                return candidate
+        return candidates[-1]
+
+    def estimate(self, plan: DegradationPlan) -> float:
+        """Estimate the seconds a plan takes from the observed stage durations."""
+        seconds = (
+            plan.max_iterations * self.estimates["research_iteration"]
+            + self.estimates["draft"]
+            + self.estimates[f"quality_{plan.quality_mode}"]
+        )
+        if plan.allow_revision:
+            seconds += self.estimates["revise"]
+        return seconds
+
+    def _observe(self, plan: DegradationPlan, timings: Dict[str, float]) -> None:
+        """Fold a finished run's stage timings into the estimates."""
+        # Research often stops before max_iterations, so the orchestrator
+        # reports the time per iteration it actually ran, on both the
+        # sequential and the speculative path
+        observed = {
+            "research_iteration": timings.get("research_iteration"),
+            "draft": timings.get("draft"),
+            f"quality_{plan.quality_mode}": timings.get("quality"),
+            "revise": timings.get("revise"),
+        }
+        with self._cond:
+            for name, seconds in observed.items():
+                if seconds is not None:
+                    self.estimates[name] += self.smoothing * (
+                        seconds - self.estimates[name]
+                    )
+
+    def _next_job(self) -> Optional[_Job]:
+        """Wait for the highest-priority job this worker may run."""
+        with self._cond:
+            while True:
+                if self._queue:
+                    job = self._queue[0]
+                    batch_slots = self.workers - self.reserved_interactive
+                    if (
+                        job.priority == Priority.INTERACTIVE
+                        or self._running_batch < batch_slots
+                    ):
+                        heapq.heappop(self._queue)
+                        if job.priority == Priority.BATCH:
+                            self._running_batch += 1
+                        return job
+                elif self._closed:
+                    return None
+                self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    if job.priority == Priority.BATCH:
+                        self._running_batch -= 1
+                    self._cond.notify_all()
+
+    def _run(self, job: _Job) -> None:
+        if not job.future.set_running_or_notify_cancel():
+            return
+
+        plan = self.plan(job.deadline_at)
+        if plan.max_iterations < self.max_iterations or not plan.allow_revision:
+            logger.info(f"Degrading job for deadline: {plan}")
+        timings: Dict[str, float] = {}
+        try:
+            result = self.orchestrator.run_research(
+                job.question,
+                max_iterations=plan.max_iterations,
+                allow_revision=plan.allow_revision,
+                quality_mode=plan.quality_mode,
+                reuse_archived=job.reuse_archived,
+                archive_max_age=job.archive_max_age,
+                stage_timings=timings,
+            )
+        except Exception as e:
+            logger.error(f"Scheduled job failed: {str(e)}")
+            with self._cond:
+                self._stats[job.priority].failed += 1
+            job.future.set_exception(e)
+            return
+
+        finished = time.monotonic()
+        self._observe(plan, timings)
+        with self._cond:
+            stats = self._stats[job.priority]
+            stats.completed += 1
+            if plan != DegradationPlan(max_iterations=self.max_iterations):
+                stats.degraded += 1
+            if job.deadline_at is not None and finished > job.deadline_at:
+                stats.deadline_misses += 1
+            self._latencies[job.priority].append(finished - job.submitted_at)
+        job.future.set_result(result)
+
+    def stats(self) -> Dict[str, SchedulerStats]:
+        """Return per-class outcomes with the p95 latency from submit to result."""
+        report = {}
+        with self._cond:
+            for priority in Priority:
+                stats = self._stats[priority].model_copy()
+                latencies = sorted(self._latencies[priority])
+                if latencies:
+                    stats.p95_seconds = latencies[
+                        min(int(round(0.95 * (len(latencies) - 1))), len(latencies) - 1)
+                    ]
+                report[priority.name.lower()] = stats
+        return report
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; workers exit once the queue is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -0,0 +1,140 @@
+import hashlib
+import mmap
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+
+class SpilledText:
+    """A passage kept in a store's spill file and decoded on demand."""
+
+    __slots__ = ("_store", "offset", "length")
+
+    def __init__(self, store: "SourceStore", offset: int, length: int):
+        self._store = store
+        self.offset = offset
+        self.length = length
+
+    def __str__(self) -> str:
+        return self._store.read(self.offset, self.length)
+
+    def __repr__(self) -> str:
+        return f"SpilledText(offset={self.offset}, length={self.length})"
+
+    def __reduce__(self):
+        # The spill file is private to its store, so copies carry the text itself
+        return (str, (str(self),))
+
+
+Passage = Union[str, SpilledText]
+
+
+class SourceStore:
+    def __init__(
+        self,
+        spill_threshold: Optional[int] = 8 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initialize a per-job store for research passages.
+
+        Identical passages are stored once. Once the in-memory passages reach
+        spill_threshold bytes, new passages are written to a temporary file and
+        read back through mmap, so resident memory stays bounded. The owner of
+        the job closes the store when the job ends; spilled passages can't be
+        read after that.
+
+        Args:
+            spill_threshold: In-memory budget in bytes before passages spill to
+                disk; None keeps every passage in memory
+            spill_dir: Directory for the spill file (system temp dir by default)
+        """
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self._passages: Dict[bytes, Passage] = {}
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "SourceStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def intern(self, text: str) -> str:
+        """Intern a short, frequently repeated string such as a query."""
+        return sys.intern(text)
+
+    def add(self, text: str) -> Passage:
+        """Store a passage and return a reference to the shared copy."""
+        data = text.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            existing = self._passages.get(digest)
+            if existing is not None:
+                return existing
+
+            if (
+                self.spill_threshold is None
+                or self.memory_bytes + len(data) <= self.spill_threshold
+            ):
+                passage: Passage = text
+                self.memory_bytes += len(data)
+            else:
+                passage = self._spill(data)
+            self._passages[digest] = passage
+            return passage
+
+    def _spill(self, data: bytes) -> SpilledText:
+        """Append encoded text to the spill file."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(
+                prefix="kairon_sources_", dir=self.spill_dir
+            )
+        offset = self.spilled_bytes
+        self._file.seek(offset)
+        self._file.write(data)
+        self._file.flush()
+        self.spilled_bytes += len(data)
+        return SpilledText(self, offset, len(data))
+
+    def read(self, offset: int, length: int) -> str:
+        """Decode a spilled passage from the memory-mapped spill file."""
+        with self._lock:
+            if self._closed:
+                raise ValueError(
+                    "Cannot read a spilled passage from a closed source store"
+                )
+            if self._map is None or len(self._map) < offset + length:
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(
+                    self._file.fileno(), self.spilled_bytes, access=mmap.ACCESS_READ
+                )
+            return self._map[offset : offset + length].decode("utf-8")
+
+    def close(self) -> None:
+        """Release the spill file and its mapping."""
+        with self._lock:
+            self._closed = True
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def format_sources(sources: List[Dict[str, Any]]) -> str:
+    """Render source entries as text in a single pass."""
+    return "\n\n".join(
+        "\n".join(f"{key}: {value}" for key, value in item.items()) for item in sources
+    )
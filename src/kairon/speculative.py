@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .draft_agent import DraftAgent
+from .local_checks import source_vocabulary
+from .research_agent import ResearchState
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculationReport(BaseModel):
+    """Timing and outcome of an overlapped research and drafting run."""
+
+    research_seconds: float = 0.0
+    draft_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    sequential_estimate_seconds: float = 0.0
+    saved_seconds: float = 0.0
+    drafts_started: int = 0
+    drafts_discarded: int = 0
+    final_action: str = ""
+
+
+def novelty(
+    new_sources: List[Dict[str, Any]], known_sources: List[Dict[str, Any]]
+) -> float:
+    """Return the fraction of the new sources' vocabulary the known sources lack."""
+    new_vocab = source_vocabulary(new_sources)
+    if not new_vocab:
+        return 0.0
+    return len(new_vocab - source_vocabulary(known_sources)) / len(new_vocab)
+
+
+class SpeculativeDrafter:
+    def __init__(
+        self,
+        draft_agent: DraftAgent,
+        keep_threshold: float = 0.1,
+        restart_threshold: float = 0.5,
+    ):
+        """
+        Initialize the speculative drafter.
+
+        Args:
+            draft_agent: Agent used for drafting and revising
+            keep_threshold: Novelty below which new findings leave the draft unchanged
+            restart_threshold: Novelty at or above which the draft is redone from
+                scratch
+        """
+        self.draft_agent = draft_agent
+        self.keep_threshold = keep_threshold
+        self.restart_threshold = restart_threshold
+
+    def run(
+        self, research: Callable[[Callable[[ResearchState], None]], ResearchState]
+    ) -> Tuple[ResearchState, str, SpeculationReport]:
+        """
+        Run research while drafting from the findings gathered so far.
+
+        Args:
+            research: Callable running the research loop; it receives a callback
+                to invoke with the research state after each iteration
+
+        Returns:
+            Tuple[ResearchState, str, SpeculationReport]: The final research state,
+            the draft covering it and the timing report
+        """
+        report = SpeculationReport()
+        lock = threading.Lock()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kairon-draft")
+        speculation: Dict[str, Any] = {"future": None, "sources": []}
+        draft_durations: List[float] = []
+
+        def timed_draft(state: ResearchState) -> str:
+            start = time.perf_counter()
+            draft = self.draft_agent.draft_answer(state)
+            draft_durations.append(time.perf_counter() - start)
+            return draft
+
+        def start_draft(state: ResearchState) -> None:
+            snapshot = state.model_copy(
+                update={"gathered_information": list(state.gathered_information)}
+            )
+            speculation["future"] = executor.submit(timed_draft, snapshot)
+            speculation["sources"] = snapshot.gathered_information
+            report.drafts_started += 1
+
+        def on_iteration(state: ResearchState) -> None:
+            with lock:
+                future: Optional[Future] = speculation["future"]
+                if future is None:
+                    start_draft(state)
+                    return
+                if not future.done():
+                    return
+                new_sources = state.gathered_information[len(speculation["sources"]) :]
+                if (
+                    new_sources
+                    and novelty(new_sources, speculation["sources"])
+                    >= self.restart_threshold
+                ):
+                    logger.info(
+                        "New findings changed the picture; restarting speculative draft"
+                    )
+                    report.drafts_discarded += 1
+                    start_draft(state)
+
+        start = time.perf_counter()
+        try:
+            research_state = research(on_iteration)
+            report.research_seconds = time.perf_counter() - start
+
+            with lock:
+                future = speculation["future"]
+                drafted_from = speculation["sources"]
+            draft = future.result() if future is not None else None
+
+            new_sources = research_state.gathered_information[len(drafted_from) :]
+            score = novelty(new_sources, drafted_from) if new_sources else 0.0
+            if draft is None or score >= self.restart_threshold:
+                if draft is not None:
+                    report.drafts_discarded += 1
+                report.final_action = "redraft"
+                draft = timed_draft(research_state)
+            elif score >= self.keep_threshold:
+                report.final_action = "revise"
+                feedback = (
+                    "Incorporate these additional research findings:\n\n"
+                    + self.draft_agent._format_information(new_sources)
+                )
+                draft = self.draft_agent.revise_answer(draft, feedback)
+            else:
+                report.final_action = "keep"
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        report.wall_seconds = time.perf_counter() - start
+        report.draft_seconds = sum(draft_durations)
+        full_draft_seconds = draft_durations[-1] if draft_durations else 0.0
+        report.sequential_estimate_seconds = (
+            report.research_seconds + full_draft_seconds
+        )
+        report.saved_seconds = report.sequential_estimate_seconds - report.wall_seconds
+        return research_state, draft, report
@@ -0,0 +1,190 @@
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from kairon.archive import RunArchive, question_key
+from kairon.quality_agent import QualityCheck
+from kairon.research_agent import ResearchState
+from kairon.orchestrator import ResearchOrchestrator
+
+
+@pytest.fixture
+def archive():
+    archive = RunArchive(":memory:")
+    yield archive
+    archive.close()
+
+
+def record(archive, question, answer, accuracy, seconds, bias=False):
+    """Archive a run with the given score and latency."""
+    return archive.record(
+        question=question,
+        answer=answer,
+        quality_check=QualityCheck(fact_accuracy=accuracy, bias_detected=bias),
+        sources=[{"query": question, "result": f"sources about {question}"}],
+        drafts=[answer],
+        stage_seconds={"research": seconds / 2, "draft": seconds / 2},
+        total_seconds=seconds,
+    )
+
+
+def test_question_key_normalization():
+    """Test that casing, whitespace and trailing punctuation are ignored."""
+    assert question_key("  What is  Quantum Computing? ") == question_key(
+        "what is quantum computing"
+    )
+
+
+def test_record_and_round_trip(archive):
+    """Test that archived runs keep their contents."""
+    run_id = record(
+        archive, "What is quantum computing?", "Qubits and gates.", 0.9, 12.0
+    )
+    [run] = archive.search()
+    assert run.id == run_id
+    assert run.answer == "Qubits and gates."
+    assert run.quality.fact_accuracy == 0.9
+    assert run.stage_seconds == {"research": 6.0, "draft": 6.0}
+    assert run.sources[0]["result"] == "sources about What is quantum computing?"
+    assert run.drafts == ["Qubits and gates."]
+
+
+def test_full_text_search(archive):
+    """Test text search over questions, answers and sources."""
+    record(archive, "What is quantum computing?", "Qubits and gates.", 0.9, 12.0)
+    record(archive, "How do vaccines work?", "They train the immune system.", 0.8, 8.0)
+    assert [r.question for r in archive.search("qubits")] == [
+        "What is quantum computing?"
+    ]
+    assert [r.question for r in archive.search("immune")] == ["How do vaccines work?"]
+    assert archive.search('"unbalanced quote') == []
+
+
+def test_filters_and_ordering(archive):
+    """Test filtering by score, latency and date, and ordering."""
+    record(archive, "fast and good", "a", 0.9, 5.0)
+    record(archive, "slow and good", "b", 0.95, 60.0)
+    record(archive, "slow and bad", "c", 0.4, 90.0)
+
+    assert [r.question for r in archive.search(max_score=0.5)] == ["slow and bad"]
+    assert [r.question for r in archive.search(min_seconds=30, order_by="slowest")] == [
+        "slow and bad",
+        "slow and good",
+    ]
+    assert archive.search(order_by="best", limit=1)[0].question == "slow and good"
+    assert len(archive.search(since=datetime.now() - timedelta(minutes=1))) == 3
+    assert archive.search(until=datetime.now() - timedelta(minutes=1)) == []
+    with pytest.raises(ValueError):
+        archive.search(order_by="random")
+
+
+def test_find_answer(archive):
+    """Test reuse of high-quality answers for repeat questions."""
+    record(archive, "What is quantum computing?", "weak answer", 0.6, 10.0)
+    record(
+        archive, "What is quantum computing?", "biased answer", 0.95, 10.0, bias=True
+    )
+    assert archive.find_answer("what is quantum computing", min_score=0.8) is None
+
+    record(archive, "What is quantum computing?", "good answer", 0.9, 10.0)
+    assert (
+        archive.find_answer("What is quantum computing?", min_score=0.8).answer
+        == "good answer"
+    )
+    assert (
+        archive.find_answer("What is quantum computing?", max_age=timedelta(seconds=-1))
+        is None
+    )
+
+
+def test_orchestrator_archives_and_reuses_runs(archive):
+    """Test that runs are archived and repeat questions are answered instantly."""
+    with patch("kairon.research_agent.TavilyClient"):
+        orchestrator = ResearchOrchestrator(archive=archive)
+        state = ResearchState(
+            research_question="Test question",
+            gathered_information=[{"query": "test query", "result": "test result"}],
+        )
+        orchestrator.research_agent.research = Mock(return_value=state)
+        orchestrator.draft_agent.draft_answer = Mock(return_value="Draft")
+        orchestrator.quality_agent.check_content = Mock(
+            return_value=QualityCheck(fact_accuracy=0.9)
+        )
+
+        answer, _ = orchestrator.run_research("Test question")
+        [run] = archive.search("test result")
+        assert run.answer == answer
+        assert set(run.stage_seconds) == {
+            "research",
+            "research_iteration",
+            "draft",
+            "quality",
+            "state_validation",
+        }
+
+        cached_answer, quality_check = orchestrator.run_research("test question?")
+        assert cached_answer == "Draft"
+        assert quality_check.fact_accuracy == 0.9
+        assert orchestrator.research_agent.research.call_count == 1
+
+        orchestrator.run_research("Test question", reuse_archived=False)
+        assert orchestrator.research_agent.research.call_count == 2
+
+
+def test_orchestrator_bounds_archived_answer_age():
+    """Test that only recent archived answers are reused and reuse can be turned off."""
+    with patch("kairon.research_agent.TavilyClient"):
+        archive = Mock()
+        archive.find_answer.return_value = None
+        orchestrator = ResearchOrchestrator(archive=archive)
+        orchestrator.research_agent.research = Mock(
+            return_value=ResearchState(
+                research_question="Test question",
+                gathered_information=[{"query": "test query", "result": "test result"}],
+            )
+        )
+        orchestrator.draft_agent.draft_answer = Mock(return_value="Draft")
+        orchestrator.quality_agent.check_content = Mock(
+            return_value=QualityCheck(fact_accuracy=0.9)
+        )
+
+        with patch("kairon.orchestrator.ARCHIVE_REUSE_MAX_AGE", 600.0):
+            orchestrator.run_research("Test question")
+            assert archive.find_answer.call_args.kwargs["max_age"] == timedelta(
+                seconds=600
+            )
+
+            orchestrator.run_research("Test question", archive_max_age=60)
+            assert archive.find_answer.call_args.kwargs["max_age"] == timedelta(
+                seconds=60
+            )
+
+            orchestrator.run_research("Test question", archive_max_age=0)
+            assert archive.find_answer.call_count == 2
+
+        with patch("kairon.orchestrator.ARCHIVE_REUSE_MAX_AGE", 0.0):
+            orchestrator.run_research("Test question")
+            assert archive.find_answer.call_count == 2
+
+
+def test_failed_archive_write_still_returns_answer():
+    """Test that an archive error after a paid-for run does not lose the answer."""
+    with patch("kairon.research_agent.TavilyClient"):
+        archive = Mock()
+        archive.find_answer.return_value = None
+        archive.record.side_effect = sqlite3.OperationalError("database is locked")
+        orchestrator = ResearchOrchestrator(archive=archive)
+        orchestrator.research_agent.research = Mock(
+            return_value=ResearchState(
+                research_question="Test question",
+                gathered_information=[{"query": "test query", "result": "test result"}],
+            )
+        )
+        orchestrator.draft_agent.draft_answer = Mock(return_value="Draft")
+        orchestrator.quality_agent.check_content = Mock(
+            return_value=QualityCheck(fact_accuracy=0.9)
+        )
+
+        answer, _ = orchestrator.run_research("Test question")
+        assert answer == "Draft"
+        assert archive.record.call_count == 1
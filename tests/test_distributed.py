@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from kairon.distributed import (
+    DistributedClient,
+    GlobalRateLimiter,
+    JobFailed,
+    SharedSearchClient,
+    Worker,
+)
+from kairon.quality_agent import QualityCheck
+from kairon.queue_backend import RedisBackend, SQLiteBackend, backend_from_url
+
+
+class FakeOrchestrator:
+    """Stands in for the pipeline; honours a global limit like the real workers."""
+
+    def __init__(self, backend):
+        self.limiter = GlobalRateLimiter(backend, {"gemini": 1000})
+        self.calls = 0
+
+    def run_research(self, question, **options):
+        if question == "fail":
+            raise RuntimeError("quota exhausted")
+        self.calls += 1
+        self.limiter.wait("gemini")
+        time.sleep(0.2)
+        return f"answer to {question}", QualityCheck(fact_accuracy=0.9)
+
+
+def run_worker(path, barrier):
+    worker = Worker(
+        SQLiteBackend(path), orchestrator_factory=FakeOrchestrator, poll_interval=0.05
+    )
+    barrier.wait()
+    worker.run(idle_timeout=1.0)
+
+
+def test_worker_processes_share_one_queue(tmp_path):
+    """Test that several worker processes drain a queue, each job exactly once."""
+    path = str(tmp_path / "queue.db")
+    backend = SQLiteBackend(path)
+    client = DistributedClient(backend, poll_interval=0.05)
+    job_ids = [client.submit(f"question {i}") for i in range(9)]
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(3)
+    workers = [
+        context.Process(target=run_worker, args=(path, barrier)) for _ in range(3)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    statuses = [backend.status(job_id) for job_id in job_ids]
+    assert all(
+        status["status"] == "done" and status["attempts"] == 1 for status in statuses
+    )
+    assert len({status["worker"] for status in statuses}) > 1
+    assert client.result(job_ids[4], timeout=1) == (
+        "answer to question 4",
+        QualityCheck(fact_accuracy=0.9),
+    )
+    assert backend.acquire("gemini", 1000, 60.0)
+
+
+def test_repeated_question_is_answered_from_shared_cache(tmp_path):
+    """Test that a finished answer is reused for the same question and options."""
+    backend = SQLiteBackend(str(tmp_path / "queue.db"))
+    worker = Worker(backend, orchestrator_factory=FakeOrchestrator)
+    client = DistributedClient(backend, poll_interval=0.01)
+
+    first = client.submit("What limits qubits?")
+    second = client.submit("what limits qubits")
+    third = client.submit("What limits qubits?", quality_mode="single")
+    assert worker.run(idle_timeout=0) == 3
+    assert worker.orchestrator.calls == 2
+    assert client.result(first) == client.result(second)
+    assert client.result(third)[0] == "answer to What limits qubits?"
+
+
+def test_failed_and_slow_jobs_surface_to_client(tmp_path):
+    """Test that failures raise JobFailed and unfinished jobs time out."""
+    backend = SQLiteBackend(str(tmp_path / "queue.db"))
+    client = DistributedClient(backend, poll_interval=0.01)
+    failing = client.submit("fail")
+    pending = client.submit("not yet picked up")
+    Worker(backend, orchestrator_factory=FakeOrchestrator).run(max_jobs=1)
+
+    with pytest.raises(JobFailed, match="quota exhausted"):
+        client.result(failing)
+    with pytest.raises(TimeoutError):
+        client.result(pending, timeout=0.05)
+    with pytest.raises(ValueError):
+        client.submit("")
+
+
+def test_expired_lease_is_reclaimed_then_failed(tmp_path):
+    """Test that jobs of crashed workers are retried up to max_attempts."""
+    backend = SQLiteBackend(str(tmp_path / "queue.db"), max_attempts=2)
+    backend.enqueue("job", {"question": "q"})
+    assert backend.claim("crashed-1", lease_seconds=0)[0] == "job"
+    time.sleep(0.01)
+    assert backend.claim("crashed-2", lease_seconds=0)[0] == "job"
+    time.sleep(0.01)
+    assert backend.claim("worker-3", lease_seconds=60) is None
+    assert backend.status("job")["status"] == "failed"
+
+
+def test_only_the_owning_worker_finishes_a_job(tmp_path):
+    """Test that a worker whose job was reclaimed cannot renew, complete or fail it."""
+    backend = SQLiteBackend(str(tmp_path / "queue.db"))
+    backend.enqueue("job", {"question": "q"})
+    backend.claim("slow", lease_seconds=0)
+    time.sleep(0.01)
+    assert backend.claim("fast", lease_seconds=60)[0] == "job"
+
+    assert not backend.renew("job", "slow", 60)
+    assert not backend.complete("job", "slow", {"answer": "stale"})
+    assert not backend.fail("job", "slow", "timed out")
+    assert backend.complete("job", "fast", {"answer": "a"})
+    assert backend.status("job")["result"] == {"answer": "a"}
+
+
+def test_rate_limit_is_global_across_connections(tmp_path):
+    """Test that limits are shared by every connection to the broker."""
+    path = str(tmp_path / "queue.db")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    assert first.acquire("tavily", 2, 60.0)
+    assert second.acquire("tavily", 2, 60.0)
+    assert not first.acquire("tavily", 2, 60.0)
+    assert not second.acquire("tavily", 2, 60.0)
+    assert first.acquire("gemini", 2, 60.0)
+
+
+def test_search_results_are_shared_between_workers(tmp_path):
+    """Test that a search made by one worker is served to another from the cache."""
+    path = str(tmp_path / "queue.db")
+    inner = Mock()
+    inner.search.return_value = {"results": [{"content": "qubits"}]}
+    first = SharedSearchClient(inner, SQLiteBackend(path))
+    second = SharedSearchClient(inner, SQLiteBackend(path))
+    assert (
+        first.search("qubits")
+        == second.search("qubits")
+        == {"results": [{"content": "qubits"}]}
+    )
+    assert inner.search.call_count == 1
+
+
+def test_backend_from_url(tmp_path):
+    """Test choosing a backend from its URL."""
+    assert isinstance(
+        backend_from_url(f"sqlite:///{tmp_path / 'queue.db'}"), SQLiteBackend
+    )
+    with pytest.raises(ValueError):
+        backend_from_url("amqp://localhost")
+
+
+def test_redis_backend_round_trip():
+    """Test the Redis backend against an in-memory Redis server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua scripts with lupa
+    backend = RedisBackend(client=fakeredis.FakeRedis())
+    backend.enqueue("job", {"question": "q"})
+    assert backend.claim("worker", lease_seconds=60) == ("job", {"question": "q"})
+    assert not backend.complete("job", "other", {"answer": "stale"})
+    assert backend.complete("job", "worker", {"answer": "a"})
+    assert backend.status("job")["result"] == {"answer": "a"}
+    assert backend.acquire("tavily", 1, 60.0) and not backend.acquire("tavily", 1, 60.0)
+    backend.cache_set("k", b"v", ttl=60)
+    assert backend.cache_get("k") == b"v"
+
+
+def test_redis_claims_never_requeue_a_job_being_claimed():
+    """Test that concurrent claims and lease requeues hand each job out exactly once."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    backend = RedisBackend(client=fakeredis.FakeRedis(server=server), max_attempts=1)
+    for i in range(50):
+        backend.enqueue(f"job {i}", {"question": f"q {i}"})
+
+    claims = []
+
+    def drain(worker_id):
+        # An empty queue makes claim scan for expired leases, racing the other claims
+        client = RedisBackend(client=fakeredis.FakeRedis(server=server), max_attempts=1)
+        for _ in range(200):
+            claimed = client.claim(worker_id, lease_seconds=60)
+            if claimed is not None:
+                claims.append(claimed[0])
+                assert client.complete(claimed[0], worker_id, {"answer": "a"})
+
+    threads = [threading.Thread(target=drain, args=(f"worker {i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claims) == sorted(f"job {i}" for i in range(50))
+    assert all(backend.status(f"job {i}")["status"] == "done" for i in range(50))
@@ -16,7 +16,7 @@ def test_draft_agent_initialization(mock_gemini):
     with patch('langchain_google_genai.ChatGoogleGenerativeAI', return_value=mock_gemini):
         agent = DraftAgent()
         assert agent is not None
-        assert hasattr(agent, 'llm')
+        assert hasattr(agent, 'router')
 
 def test_draft_agent_format_information():
     """Test the information formatting function."""
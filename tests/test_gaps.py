@@ -0,0 +1,64 @@
+from kairon.gaps import ENTITY_PRIORITY, GapQueue, extract_gaps, gap_terms
+
+FINDINGS = """Google Quantum AI reported below-threshold error correction.
+How long can logical qubits stay coherent at scale?
+The cost of cryogenic control electronics remains unclear.
+IBM and Google Quantum AI both published roadmaps."""
+
+
+def test_extract_gaps_finds_questions_gaps_and_entities():
+    """Test that sub-questions, stated gaps and entities are extracted."""
+    found = {text: (kind, priority) for text, kind, priority in extract_gaps(FINDINGS)}
+    assert found["How long can logical qubits stay coherent at scale?"][0] == "question"
+    assert (
+        found["The cost of cryogenic control electronics remains unclear."][0] == "gap"
+    )
+    assert found["Google Quantum AI"] == ("entity", ENTITY_PRIORITY + 0.1)
+    assert "IBM" not in found  # mentioned only once
+
+
+def test_gap_terms_ignore_order_and_stopwords():
+    """Test that rephrasings of the same gap share a key."""
+    assert gap_terms("Qubit coherence at scale") == gap_terms(
+        "scale of the qubit coherence"
+    )
+
+
+def test_gap_queue_orders_and_dedupes():
+    """Test that gaps come out by priority and repeats are dropped."""
+    queue = GapQueue("What limits logical qubits?")
+    assert queue.extend(FINDINGS) == 3
+    assert not queue.push(
+        "At scale, how long do logical qubits stay coherent?", "question", 2.0
+    )
+    assert not queue.push("logical qubits limits", "question", 5.0)
+
+    gaps = queue.pop(2)
+    assert [gap.kind for gap in gaps] == ["question", "gap"]
+    assert gaps[0].priority > 2.0  # shares terms with the question
+    assert queue.texts() == ["Google Quantum AI"]
+    assert queue.pop(5)[-1].text == "Google Quantum AI"
+    assert queue.peek() is None
+
+
+def test_gap_queue_skips_and_drops_answered_gaps():
+    """Test that gaps already covered by gathered information are not searched."""
+    queue = GapQueue("What limits logical qubits?")
+    queue.extend("Cryogenic control costs are unknown. Is fabrication yield improving?")
+    assert len(queue) == 2
+
+    # A later finding answers the stated gap, so raising it again queues nothing
+    assert queue.extend("Cryogenic control costs fell sharply.") == 0
+    assert queue.texts() == ["Is fabrication yield improving?"]
+    assert queue.extend("Cryogenic control costs are unclear.") == 0
+    assert len(queue) == 1
+
+
+def test_extract_gaps_skips_chat_and_strips_emphasis():
+    """Test that closers addressed to the reader are ignored and markdown removed."""
+    found = extract_gaps(
+        "**Error Correction**: Overheads remain unclear. "
+        "Would you like me to search for more details on any of these? "
+        "Let me know if further research helps."
+    )
+    assert found == [("Error Correction: Overheads remain unclear.", "gap", 1.5)]
@@ -0,0 +1,130 @@
+from kairon.local_checks import (
+    MIN_WORDS,
+    LocalSignals,
+    analyze_content,
+    bias_verdict,
+    readability_suggestions,
+    readability_verdict,
+)
+
+SOURCE_TEXT = (
+    "Researchers reported that superconducting qubits reached longer coherence "
+    "times this year. Error correction experiments showed logical qubits "
+    "outperforming physical qubits for the first time."
+)
+
+
+def _long_draft(sentence: str) -> str:
+    """Repeat a sentence until the draft exceeds the minimum word count."""
+    repeats = MIN_WORDS // len(sentence.split()) + 1
+    return " ".join([sentence] * repeats)
+
+
+def test_analyze_content_empty():
+    """Test that empty content yields empty signals."""
+    signals = analyze_content("", [])
+    assert signals.word_count == 0
+    assert signals.readability_score == 0.0
+
+
+def test_analyze_content_readability():
+    """Test that simple text scores as more readable than dense text."""
+    simple = analyze_content("The cat sat. The dog ran. We all had fun.", [])
+    dense = analyze_content(
+        "Superconducting quantum architectures necessitate sophisticated "
+        "error-correction methodologies incorporating topological considerations.",
+        [],
+    )
+    assert simple.sentence_count == 3
+    assert simple.readability_score > dense.readability_score
+    assert simple.flesch_kincaid_grade < dense.flesch_kincaid_grade
+
+
+def test_analyze_content_source_coverage():
+    """Test lexical coverage of the draft against the sources."""
+    sources = [{"query": "quantum", "result": SOURCE_TEXT}]
+    covered = analyze_content(
+        "Superconducting qubits reached longer coherence times.", sources
+    )
+    uncovered = analyze_content("Bananas contain potassium and taste sweet.", sources)
+    assert covered.source_coverage == 1.0
+    assert uncovered.source_coverage == 0.0
+
+
+def test_analyze_content_bias_hits():
+    """Test that loaded terms are reported once each and intensifiers are ignored."""
+    signals = analyze_content(
+        "The so-called reform is absurd, clearly the absurd best plan.", []
+    )
+    assert signals.bias_hits == ["absurd", "so-called"]
+
+
+def test_short_content_is_escalated():
+    """Test that every check is escalated for short drafts."""
+    signals = analyze_content(
+        "Qubits reached longer coherence times.", [{"result": SOURCE_TEXT}]
+    )
+    assert readability_verdict(signals) is None
+    assert bias_verdict(signals) is None
+
+
+def test_confident_verdicts_for_long_clean_draft():
+    """Test that a long, neutral draft needs no LLM bias check."""
+    draft = _long_draft(
+        "Superconducting qubits always reached the best coherence times this year."
+    )
+    signals = analyze_content(draft, [{"result": SOURCE_TEXT}])
+    assert signals.source_coverage < 1.0
+    assert bias_verdict(signals) is False
+
+
+def test_bias_lexicon_hits_only_escalate():
+    """Test that lexicon hits send a draft to the LLM instead of concluding bias."""
+    base = LocalSignals(word_count=MIN_WORDS)
+    assert bias_verdict(base) is False
+    many = base.model_copy(update={"bias_hits": ["absurd", "propaganda", "so-called"]})
+    assert bias_verdict(many) is None
+
+
+def test_readability_verdict_ambiguous_band():
+    """Test that mid-range readability is escalated."""
+    assert (
+        readability_verdict(LocalSignals(word_count=MIN_WORDS, readability_score=0.4))
+        is None
+    )
+    assert (
+        readability_verdict(LocalSignals(word_count=MIN_WORDS, readability_score=0.8))
+        == 0.8
+    )
+
+
+def test_readability_suggestions():
+    """Test suggestions for long sentences and high grade level."""
+    signals = LocalSignals(word_count=60, sentence_count=2, flesch_kincaid_grade=16.0)
+    assert len(readability_suggestions(signals)) == 2
+    assert readability_suggestions(LocalSignals(word_count=10, sentence_count=2)) == []
+
+
+def test_markdown_blocks_count_as_sentences():
+    """Test that an easy bulleted draft is split at its bullets and headings."""
+    draft = "\n".join(
+        ["## Key points", ""]
+        + [
+            f"- **Point {i}**: qubits now hold their state for a bit longer"
+            for i in range(1, 8)
+        ]
+        + ["", "### Next steps", ""]
+        + [f"{i}. Labs plan to test more chips this year" for i in range(1, 6)]
+    )
+    signals = analyze_content(draft, [])
+    assert signals.word_count > MIN_WORDS
+    assert signals.sentence_count == 14
+    assert readability_verdict(signals) == signals.readability_score > 0.5
+    assert readability_suggestions(signals) == []
+
+
+def test_run_on_text_is_escalated():
+    """Test that text with implausibly long sentences is left to the LLM."""
+    signals = analyze_content(" ".join(["the cat sat on the mat"] * 20), [])
+    assert signals.sentence_count == 1
+    assert readability_verdict(signals) is None
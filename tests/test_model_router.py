@@ -0,0 +1,151 @@
+import pytest
+from unittest.mock import Mock
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from kairon.model_router import ModelRoute, ModelRouter
+from kairon.draft_agent import DraftAgent
+from kairon.research_agent import ResearchState
+
+
+def fake_factory(route):
+    """Create a mock chat model that echoes its model name."""
+    llm = Mock()
+    llm.model = route.model
+    llm.invoke.return_value.content = f"answer from {route.model}"
+    return llm
+
+
+def test_from_config_parses_chains():
+    """Test building routes from a JSON spec."""
+    router = ModelRouter.from_config(
+        '{"default": "gemini-2.0-flash", '
+        '"quality": ["gemini-2.0-flash-lite", "gemini-2.0-flash"], '
+        '"draft.draft": [{"model": "gemini-2.5-pro", "temperature": 0.2}]}',
+        llm_factory=fake_factory,
+    )
+    assert [r.model for r in router.chain_for("quality.bias_check")] == [
+        "gemini-2.0-flash-lite",
+        "gemini-2.0-flash",
+    ]
+    assert router.chain_for("draft.draft")[0].temperature == 0.2
+    assert router.chain_for("draft.revise")[0].model == "gemini-2.0-flash"
+
+
+def test_from_config_rejects_empty_chain():
+    """Test that an empty chain is a configuration error."""
+    with pytest.raises(ValueError):
+        ModelRouter.from_config('{"draft": []}', llm_factory=fake_factory)
+
+
+def test_llms_are_cached_per_route():
+    """Test that each model is only created once."""
+    factory = Mock(side_effect=fake_factory)
+    router = ModelRouter(llm_factory=factory)
+    route = ModelRoute(model="gemini-2.0-flash")
+    assert router.llm_for(route) is router.llm_for(route)
+    assert factory.call_count == 1
+
+
+def test_invoke_falls_back_on_error():
+    """Test that a failing model falls back to the next route."""
+    router = ModelRouter(
+        routes={"draft": [ModelRoute(model="primary"), ModelRoute(model="backup")]},
+        llm_factory=fake_factory,
+    )
+    router.primary_llm("draft.draft").invoke.side_effect = RuntimeError(
+        "quota exceeded"
+    )
+
+    response = router.invoke("draft.draft", "prompt")
+    assert response.content == "answer from backup"
+    assert router.p95("primary") is None
+
+
+def test_invoke_raises_when_chain_exhausted():
+    """Test that the last error is raised when every route fails."""
+    router = ModelRouter(
+        routes={"draft": [ModelRoute(model="only")]}, llm_factory=fake_factory
+    )
+    router.primary_llm("draft.draft").invoke.side_effect = RuntimeError("down")
+    with pytest.raises(RuntimeError):
+        router.invoke("draft.draft", "prompt")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers or fails offline, firing langchain callbacks."""
+
+    fail: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def test_limiter_runs_before_each_request():
+    """Test that the limiter sees every model tried and every request in one call."""
+    limiter = Mock()
+    router = ModelRouter(
+        routes={"draft": [ModelRoute(model="primary"), ModelRoute(model="backup")]},
+        llm_factory=lambda route: ScriptedChatModel(fail=route.model == "primary"),
+        limiter=limiter,
+    )
+    assert router.invoke("draft.draft", "prompt").content == "ok"
+    assert [call.args[0] for call in limiter.call_args_list] == ["primary", "backup"]
+
+    # An agent run makes several requests through one routed call
+    limiter.reset_mock()
+    router.call("draft.revise", lambda llm: [llm.invoke("plan"), llm.invoke("answer")])
+    assert [call.args[0] for call in limiter.call_args_list] == [
+        "primary",
+        "backup",
+        "backup",
+    ]
+
+
+def test_p95_requires_min_samples():
+    """Test p95 computation over the latency window."""
+    router = ModelRouter(llm_factory=fake_factory, min_samples=5)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        router.record_latency("m", seconds)
+    assert router.p95("m") is None
+    router.record_latency("m", 2.0)
+    assert router.p95("m") == 2.0
+
+
+def test_latency_aware_selection_demotes_slow_routes():
+    """Test that a route over its p95 ceiling is tried last."""
+    chain = [ModelRoute(model="slow", max_p95=1.0), ModelRoute(model="fast")]
+    router = ModelRouter(
+        routes={"quality": chain}, llm_factory=fake_factory, min_samples=1
+    )
+    assert [r.model for r in router.select("quality.readability")] == ["slow", "fast"]
+
+    router.record_latency("slow", 3.0)
+    assert [r.model for r in router.select("quality.readability")] == ["fast", "slow"]
+
+    router.latency_aware = False
+    assert [r.model for r in router.select("quality.readability")] == ["slow", "fast"]
+
+
+def test_draft_agent_uses_routed_models():
+    """Test that drafting and revising use their own routes."""
+    router = ModelRouter(
+        routes={
+            "draft.draft": [ModelRoute(model="strong")],
+            "draft.revise": [ModelRoute(model="fast")],
+        },
+        llm_factory=fake_factory,
+    )
+    agent = DraftAgent(router=router)
+    state = ResearchState(
+        research_question="Test question",
+        gathered_information=[{"query": "q", "result": "r"}],
+    )
+    assert agent.draft_answer(state) == "answer from strong"
+    assert agent.revise_answer("draft", "feedback") == "answer from fast"
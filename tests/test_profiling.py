@@ -0,0 +1,118 @@
+import os
+import time
+import pytest
+from unittest.mock import Mock, patch
+from uuid import uuid4
+from kairon.profiling import NULL_PROFILER, Profiler
+from kairon.quality_agent import QualityCheck
+from kairon.research_agent import ResearchState
+from kairon.orchestrator import ResearchOrchestrator
+
+
+def busy(seconds):
+    """Spin until this thread has used the given CPU time, however loaded the box."""
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def test_invalid_mode():
+    """Test that unknown profiling modes are rejected."""
+    with pytest.raises(ValueError):
+        Profiler(mode="perf")
+
+
+def test_null_profiler_is_noop():
+    """Test that the disabled profiler records nothing."""
+    with NULL_PROFILER.run("run"):
+        with NULL_PROFILER.stage("draft.llm"):
+            pass
+    assert not NULL_PROFILER.enabled
+    assert NULL_PROFILER.callbacks() == []
+
+
+def test_stage_splits_wall_and_cpu_time():
+    """Test that waiting shows up as wall time but not CPU time."""
+    profiler = Profiler()
+    with profiler.stage("network"):
+        time.sleep(0.05)
+    with profiler.stage("parsing"):
+        busy(0.05)
+
+    report = profiler.report()
+    assert report["network"].calls == 1
+    assert report["network"].wait_seconds >= 0.04
+    assert report["parsing"].cpu_seconds >= 0.03
+    assert "network" in profiler.format_report()
+
+
+def test_sampling_mode_writes_collapsed_stacks(tmp_path):
+    """Test collapsed stack capture in sampling mode."""
+    profiler = Profiler(
+        mode="sampling", output_dir=str(tmp_path), sample_interval=0.001
+    )
+    with profiler.run("bench"):
+        busy(0.1)
+
+    assert any("busy" in stack for stack in profiler.stacks)
+    collapsed = [name for name in os.listdir(tmp_path) if name.endswith(".collapsed")]
+    assert len(collapsed) == 1
+    line = (tmp_path / collapsed[0]).read_text().splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_cprofile_mode_dumps_stats(tmp_path):
+    """Test deterministic profile capture in cProfile mode."""
+    profiler = Profiler(mode="cprofile", output_dir=str(tmp_path))
+    with profiler.run("bench"):
+        busy(0.01)
+
+    assert profiler.profile is not None
+    names = os.listdir(tmp_path)
+    assert any(name.endswith(".pstats") for name in names)
+    assert any(name.endswith(".stages.txt") for name in names)
+
+
+def test_callbacks_time_llm_and_tool_calls():
+    """Test the langchain callback handler used inside the agent executor."""
+    profiler = Profiler()
+    handler = profiler.callbacks()[0]
+    llm_run, tool_run = uuid4(), uuid4()
+    handler.on_chat_model_start({}, [], run_id=llm_run)
+    handler.on_tool_start({}, "query", run_id=tool_run)
+    handler.on_tool_end("results", run_id=tool_run)
+    handler.on_llm_end(None, run_id=llm_run)
+
+    report = profiler.report()
+    assert report["langchain.llm"].calls == 1
+    assert report["langchain.tool"].calls == 1
+
+
+def test_orchestrator_records_stages():
+    """Test that a profiled run records each pipeline stage."""
+    with patch("kairon.research_agent.TavilyClient"):
+        profiler = Profiler()
+        orchestrator = ResearchOrchestrator(profiler=profiler)
+        assert orchestrator.draft_agent.profiler is profiler
+
+        state = ResearchState(
+            research_question="Test question",
+            gathered_information=[{"query": "test query", "result": "test result"}],
+        )
+        orchestrator.research_agent.research = Mock(return_value=state)
+        orchestrator.draft_agent.draft_answer = Mock(return_value="Draft")
+        orchestrator.quality_agent.check_content = Mock(
+            return_value=QualityCheck(fact_accuracy=0.9)
+        )
+
+        orchestrator.run_research("Test question")
+        stages = profiler.report()
+        for name in (
+            "run_research",
+            "research",
+            "draft",
+            "quality",
+            "state_validation",
+        ):
+            assert stages[name].calls == 1
+        assert "revise" not in stages
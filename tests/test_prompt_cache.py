@@ -0,0 +1,252 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.messages import AIMessage
+from kairon.draft_agent import DRAFTING_INSTRUCTIONS, DraftAgent
+from kairon.model_router import ModelRoute, ModelRouter
+from kairon.prompt_cache import (
+    CompiledPrompt,
+    ContextCache,
+    GeminiContextCache,
+    PromptStats,
+    context_cache_from_config,
+)
+from kairon.quality_agent import QualityAgent
+
+
+def fake_factory(route):
+    """Create a mock chat model that echoes its model name."""
+    llm = Mock()
+    llm.model = route.model
+    llm.temperature = route.temperature
+    llm.invoke.return_value.content = f"answer from {route.model}"
+    return llm
+
+
+def gemini_cache(**kwargs):
+    """Build a Gemini context cache with fake SDK calls."""
+    create_cache = Mock(
+        side_effect=lambda model, prefix, ttl: Mock(name=f"cache for {model}")
+    )
+    generate = Mock(
+        side_effect=lambda cache, suffix, config: (
+            AIMessage(content="Score: 0.9"),
+            1300,
+            1200,
+        )
+    )
+    return (
+        GeminiContextCache(create_cache=create_cache, generate=generate, **kwargs),
+        create_cache,
+        generate,
+    )
+
+
+def test_compiled_prompt_matches_template():
+    """Test that the compiled draft prompts render exactly what the template did."""
+    agent = DraftAgent(router=ModelRouter(llm_factory=fake_factory))
+    template = ChatPromptTemplate.from_messages(
+        [("human", DRAFTING_INSTRUCTIONS + "{input}")]
+    )
+    prefix, suffix = agent.revise_prompt.render_parts(
+        draft="A {braced} draft", feedback="Be brief"
+    )
+    expected = template.format_messages(
+        input=(
+            "Please revise the following draft based on the provided feedback:\n\n"
+            "Current Draft:\nA {braced} draft\n\nFeedback:\nBe brief\n\n"
+            "Please provide an improved version of the draft that addresses the "
+            "feedback while maintaining accuracy and clarity."
+        )
+    )
+    assert prefix + suffix == expected[0].content
+    assert suffix.startswith("Feedback:")
+
+
+def test_compiled_prompt_rejects_format_specs():
+    """Test that unsupported field formatting is caught at compile time."""
+    with pytest.raises(ValueError):
+        CompiledPrompt("Score: {score:.2f}")
+    assert CompiledPrompt("{a} and {b}", "!").render(a=1, b=2, unused=3) == "1 and 2!"
+
+
+def test_uncached_calls_are_counted_per_step():
+    """Test that the default cache sends and counts full prompts through the router."""
+    router = ModelRouter(llm_factory=fake_factory)
+    cache = ContextCache()
+    assert (
+        cache.invoke(router, "draft.draft", "x" * 400, "y" * 40).content
+        == "answer from gemini-2.0-flash"
+    )
+    cache.invoke(router, "draft.draft", "x" * 400, "z")
+    stats = cache.report()["draft.draft"]
+    assert stats.calls == 2
+    assert stats.prompt_tokens == 110 + 100
+    assert stats.saved_tokens == 0
+    assert "draft.draft" in cache.format_report()
+
+
+def test_saved_seconds_compares_cached_and_uncached_calls():
+    """Test the latency saving estimate."""
+    stats = PromptStats(calls=3, cached_calls=2, seconds=4.0, cached_seconds=2.0)
+    assert stats.saved_seconds == 2.0
+    assert PromptStats(calls=2, seconds=3.0).saved_seconds == 0.0
+
+
+def test_gemini_cache_reuses_prefix_per_model():
+    """Test that a prefix is uploaded once per model and then only suffixes are sent."""
+    cache, create_cache, generate = gemini_cache(min_prefix_tokens=10)
+    router = ModelRouter(llm_factory=fake_factory)
+    prefix = "Sources: " + "qubits " * 20
+    for suffix in ("check facts", "check bias", "check readability"):
+        assert (
+            cache.invoke(
+                router, "quality.fact_check", prefix, suffix, reused=True
+            ).content
+            == "Score: 0.9"
+        )
+    assert create_cache.call_count == 1
+    assert generate.call_args.args[1] == "check readability"
+
+    other = ModelRouter(
+        default=[ModelRoute(model="other", temperature=0.2)], llm_factory=fake_factory
+    )
+    cache.invoke(other, "quality.bias_check", prefix, "x", reused=True)
+    assert create_cache.call_count == 2
+    assert generate.call_args.args[2] == {"temperature": 0.2}
+    stats = cache.report()["quality.fact_check"]
+    assert (stats.calls, stats.cached_calls, stats.saved_tokens) == (3, 3, 3600)
+
+
+def test_gemini_cache_skips_one_off_prefixes_and_evicts_expired():
+    """Test that unflagged prefixes are cached from their second call until ttl."""
+    cache, create_cache, generate = gemini_cache(min_prefix_tokens=10, ttl=0.05)
+    router = ModelRouter(llm_factory=fake_factory)
+    draft = "Findings: " + "qubits " * 20
+    assert (
+        cache.invoke(router, "draft.draft", draft, "write").content
+        == "answer from gemini-2.0-flash"
+    )
+    assert create_cache.call_count == 0
+    assert (
+        cache.invoke(router, "draft.draft", draft, "write again").content
+        == "Score: 0.9"
+    )
+    assert create_cache.call_count == 1
+
+    time.sleep(0.06)
+    cache.invoke(router, "draft.revise", "Draft: " + "noise " * 20, "revise")
+    assert len(cache._caches) == 0
+    cache.close()
+    assert create_cache.return_value.delete.call_count == 0
+
+
+def test_gemini_cache_creates_caches_outside_the_lock():
+    """Test that a slow cache upload does not hold up calls on other cached prefixes."""
+    uploading, release = threading.Event(), threading.Event()
+
+    def slow_create(model, prefix, ttl):
+        if prefix.startswith("slow"):
+            uploading.set()
+            release.wait(5)
+        return Mock()
+
+    cache = GeminiContextCache(
+        min_prefix_tokens=1,
+        create_cache=slow_create,
+        generate=lambda cache, suffix, config: (AIMessage(content="ok"), 10, 8),
+    )
+    router = ModelRouter(llm_factory=fake_factory)
+    cache.invoke(router, "quality.fact_check", "fast prefix", "x", reused=True)
+    thread = threading.Thread(
+        target=cache.invoke,
+        args=(router, "quality.bias_check", "slow prefix", "y", True),
+    )
+    thread.start()
+    assert uploading.wait(5)
+    assert (
+        cache.invoke(
+            router, "quality.fact_check", "fast prefix", "z", reused=True
+        ).content
+        == "ok"
+    )
+    release.set()
+    thread.join()
+    assert cache.report()["quality.fact_check"].cached_calls == 2
+
+
+def test_gemini_cache_sends_short_or_uncacheable_prompts_in_full():
+    """Test the fallbacks for prefixes below the minimum and failed cache creation."""
+    cache, create_cache, generate = gemini_cache()
+    router = ModelRouter(llm_factory=fake_factory)
+    assert (
+        cache.invoke(router, "draft.revise", "short", " prompt").content
+        == "answer from gemini-2.0-flash"
+    )
+    assert create_cache.call_count == 0
+
+    cache.min_prefix_tokens = 1
+    create_cache.side_effect = RuntimeError("model does not support caching")
+    assert (
+        cache.invoke(router, "draft.revise", "short", " prompt", reused=True).content
+        == "answer from gemini-2.0-flash"
+    )
+    assert generate.call_count == 0
+    assert cache.report()["draft.revise"].cached_calls == 0
+
+
+def test_gemini_cache_remembers_failed_uploads_until_ttl():
+    """Test that a model whose upload failed is sent in full without retrying."""
+    cache, create_cache, generate = gemini_cache(min_prefix_tokens=1, ttl=0.05)
+    create_cache.side_effect = RuntimeError("model does not support caching")
+    router = ModelRouter(llm_factory=fake_factory)
+    for prefix in ("Sources: a", "Sources: a", "Sources: b"):
+        assert (
+            cache.invoke(router, "quality.fact_check", prefix, "x", reused=True).content
+            == "answer from gemini-2.0-flash"
+        )
+    assert create_cache.call_count == 1
+
+    time.sleep(0.06)
+    cache.invoke(router, "quality.fact_check", "Sources: a", "x", reused=True)
+    assert create_cache.call_count == 2
+    assert generate.call_count == 0
+
+
+def test_gemini_cache_requires_caching_sdk():
+    """Test the error raised when the installed SDK has no caching API."""
+    with patch("kairon.prompt_cache.importlib.util.find_spec", return_value=None):
+        with pytest.raises(ImportError):
+            GeminiContextCache()
+    with pytest.raises(ValueError):
+        context_cache_from_config("anthropic")
+    assert type(context_cache_from_config("")) is ContextCache
+
+
+def test_quality_checks_share_prefix_when_cached():
+    """Test that every check of every draft reuses one cached sources prefix."""
+    cache, create_cache, generate = gemini_cache(min_prefix_tokens=1)
+    agent = QualityAgent(
+        use_local_checks=False,
+        router=ModelRouter(llm_factory=fake_factory),
+        context_cache=cache,
+    )
+    sources = [{"title": "Qubits", "content": "About qubits"}]
+    agent.check_content("Quantum computers use qubits.", sources)
+    agent.check_content("Revised: quantum computers use qubits.", sources)
+    assert create_cache.call_count == 1
+    assert create_cache.call_args.args[1].startswith("Research Sources:")
+    assert "Content:" not in create_cache.call_args.args[1]
+    assert generate.call_count == 6
+    assert generate.call_args.args[1].startswith("Content: Revised")
+
+    uncached = QualityAgent(
+        use_local_checks=False, router=ModelRouter(llm_factory=fake_factory)
+    )
+    prefix, suffix = uncached.bias_check_prompt.render_parts(
+        content="text", sources="ignored"
+    )
+    assert prefix == ""
+    assert suffix.startswith("Content: text\n\n")
@@ -0,0 +1,94 @@
+import copy
+import pickle
+import pytest
+from kairon.records import (
+    CODECS,
+    Finding,
+    checkpoint,
+    dumps,
+    dumps_json,
+    loads,
+    restore,
+)
+from kairon.research_agent import ResearchState
+from kairon.source_store import SourceStore
+
+
+def test_finding_reads_like_a_dict():
+    """Test that findings work wherever the old source dicts were used."""
+    finding = Finding("qubits", "Coherence times improved.")
+    assert finding["query"] == "qubits"
+    assert dict(finding) == {"query": "qubits", "result": "Coherence times improved."}
+    assert finding == {"query": "qubits", "result": "Coherence times improved."}
+    assert list(finding.values()) == ["qubits", "Coherence times improved."]
+    assert not hasattr(finding, "__dict__")
+    with pytest.raises(KeyError):
+        finding["source"]
+
+
+def test_findings_read_copy_and_pickle_as_plain_text():
+    """Test that a spilled passage leaves a finding only as plain str."""
+    with SourceStore(spill_threshold=0) as store:
+        finding = Finding("qubits", store.add("a spilled passage"))
+        assert isinstance(finding.result, str) and isinstance(finding["result"], str)
+        assert "SpilledText" in repr(finding)
+        pickled = pickle.loads(pickle.dumps(finding))
+        copied = copy.deepcopy(finding)
+    for other in (pickled, copied):
+        assert type(other._result) is str
+        assert other == {"query": "qubits", "result": "a spilled passage"}
+    with pytest.raises(ValueError):
+        finding.result
+
+
+def test_research_state_accepts_findings_without_copying():
+    """Test that findings pass validation as is and serialize as dicts."""
+    finding = Finding("qubits", "Coherence times improved.")
+    state = ResearchState(
+        research_question="What limits qubits?",
+        gathered_information=[finding, {"source": "test", "content": "legacy dict"}],
+    )
+    assert state.gathered_information[0] is finding
+    dumped = state.model_dump()
+    assert dumped["gathered_information"][0] == {
+        "query": "qubits",
+        "result": "Coherence times improved.",
+    }
+    assert (
+        ResearchState.model_validate_json(state.model_dump_json()).gathered_information[
+            1
+        ]["content"]
+        == "legacy dict"
+    )
+
+
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_checkpoint_round_trip(codec):
+    """Test that a research state survives each installed codec."""
+    store = SourceStore(spill_threshold=0)
+    state = ResearchState(
+        research_question="What limits qubits?",
+        gathered_information=[Finding("qubits", store.add("A spilled passage."))],
+        iteration_count=2,
+    )
+    restored = restore(ResearchState, checkpoint(state, codec), codec)
+    assert restored.iteration_count == 2
+    assert restored.gathered_information == [
+        {"query": "qubits", "result": "A spilled passage."}
+    ]
+    assert loads(dumps({"n": [1, 2]}, codec), codec) == {"n": [1, 2]}
+    store.close()
+
+
+def test_dumps_rejects_unknown_codec():
+    """Test that only installed codecs are accepted."""
+    with pytest.raises(ValueError):
+        dumps({}, codec="pickle")
+
+
+def test_dumps_json_returns_text():
+    """Test JSON text output for stores that keep text columns."""
+    assert (
+        dumps_json({"sources": [Finding("q", "r")]}).replace(" ", "")
+        == '{"sources":[{"query":"q","result":"r"}]}'
+    )
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import Mock, patch
+from kairon.config import RESEARCH_MAX_STEPS
 from kairon.research_agent import ResearchAgent, ResearchState
 from tavily import TavilyClient
 
@@ -111,4 +112,66 @@ def test_research_state_with_empty_data():
     assert state.research_question == "Test question"
     assert len(state.gathered_information) == 0
     assert state.current_focus == ""
-    assert state.iteration_count == 0 
\ No newline at end of file
+    assert state.iteration_count == 0 
+
+def test_research_agent_follows_gaps_within_call_budget():
+    """Test that later iterations search open gaps in parallel, bounded by max_calls."""
+    with patch('kairon.model_router.ChatGoogleGenerativeAI'):
+        agent = ResearchAgent(search_client=Mock())
+    outputs = {
+        "What limits qubits? ": (
+            "Why do qubits decohere? Does Cryogenic Cooling Cost matter? IBM Eagle helps. "
+            "IBM Eagle and Cryogenic Cooling Cost both grow."
+        ),
+    }
+    executor = Mock()
+    executor.invoke.side_effect = lambda inputs, config: {
+        "output": outputs.get(inputs["input"], "Found more.")
+    }
+    agent._executor_for = lambda llm: executor
+
+    state = agent.research("What limits qubits?", max_iterations=3, breadth=2, max_calls=4)
+    queries = [item["query"] for item in state.gathered_information]
+    assert queries[0] == "What limits qubits? "
+    assert queries[1:3] == [
+        "What limits qubits? Why do qubits decohere?",
+        "What limits qubits? Does Cryogenic Cooling Cost matter?",
+    ]
+    assert state.search_calls == 4 == len(queries)
+    assert queries[3] == "What limits qubits? Cryogenic Cooling Cost"
+    assert state.iteration_count == 3
+    assert state.open_gaps == ["IBM Eagle"]
+
+def test_research_agent_stops_once_gaps_are_answered():
+    """Test that research ends before its budget when follow-ups answer every gap."""
+    with patch('kairon.model_router.ChatGoogleGenerativeAI'):
+        agent = ResearchAgent(search_client=Mock())
+    outputs = {
+        "What limits qubits? ": "Why do qubits decohere? The cause of high error rates is unclear.",
+        "What limits qubits? Why do qubits decohere?": "Qubits decohere from noise, the cause of high error rates.",
+    }
+    executor = Mock()
+    executor.invoke.side_effect = lambda inputs, config: {"output": outputs[inputs["input"]]}
+    agent._executor_for = lambda llm: executor
+
+    state = agent.research("What limits qubits?", max_iterations=5, breadth=1, max_calls=5)
+    assert state.search_calls == 2
+    assert state.iteration_count == 2
+    assert state.open_gaps == []
+
+    with pytest.raises(ValueError):
+        agent.research("What limits qubits?", breadth=0)
+
+
+def test_research_agent_keeps_searches_when_agent_runs_out_of_steps():
+    """Test that a step-limited agent run still yields the search results it made."""
+    with patch('kairon.model_router.ChatGoogleGenerativeAI'):
+        agent = ResearchAgent(search_client=Mock())
+    assert agent.agent_executor.max_iterations == RESEARCH_MAX_STEPS
+    executor = Mock()
+    executor.invoke.return_value = {
+        "output": "Agent stopped due to iteration limit or time limit.",
+        "intermediate_steps": [("search", "Qubits decohere."), ("search", "Noise grows.")],
+    }
+    agent._executor_for = lambda llm: executor
+    assert agent._search("What limits qubits?") == "Qubits decohere.\n\nNoise grows."
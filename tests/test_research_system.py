@@ -4,6 +4,7 @@ from kairon.research_agent import ResearchAgent, ResearchState
 from kairon.draft_agent import DraftAgent, DraftState
 from kairon.quality_agent import QualityCheck
 from kairon.orchestrator import ResearchOrchestrator
+from kairon.revision import RevisionPolicy
 import os
 from dotenv import load_dotenv
 
@@ -65,7 +66,7 @@ def test_draft_agent_initialization(mock_gemini):
     with patch('langchain_google_genai.ChatGoogleGenerativeAI', return_value=mock_gemini):
         agent = DraftAgent()
         assert agent is not None
-        assert hasattr(agent, 'chain')
+        assert hasattr(agent, 'draft_prompt')
 
 def test_draft_agent_format_information():
     """Test the information formatting function."""
@@ -146,5 +147,80 @@ def test_draft_agent_with_empty_research(mock_gemini):
         with pytest.raises(ValueError):
             agent.draft_answer(empty_state)
 
+def test_orchestrator_speculative_mode(mock_gemini, mock_tavily):
+    """Test that speculative mode drafts from research callbacks and reports timing."""
+    with patch('kairon.research_agent.TavilyClient', return_value=mock_tavily):
+        orchestrator = ResearchOrchestrator()
+        state = ResearchState(
+            research_question="Test question",
+            gathered_information=[{"query": "test query", "result": "test result"}]
+        )
+
+        def fake_research(question, max_iterations, on_iteration=None, store=None):
+            on_iteration(state)
+            return state
+
+        orchestrator.research_agent.research = fake_research
+        orchestrator.draft_agent.draft_answer = Mock(return_value="Speculative draft")
+        orchestrator.quality_agent.check_content = Mock(return_value=QualityCheck(fact_accuracy=0.9))
+
+        reports = {}
+        answer, quality_check = orchestrator.run_research("Test question", speculative=True, reports=reports)
+        assert answer == "Speculative draft"
+        assert reports["speculation"].final_action == "keep"
+        assert reports["speculation"].drafts_started == 1
+        assert not hasattr(orchestrator, "last_speculation")
+
+def test_orchestrator_returns_best_revision(mock_gemini, mock_tavily):
+    """Test that the revision loop keeps the best-scoring draft and respects allow_revision."""
+    with patch('kairon.research_agent.TavilyClient', return_value=mock_tavily):
+        orchestrator = ResearchOrchestrator(revision_policy=RevisionPolicy(max_revisions=3, target_score=0.8))
+        state = ResearchState(
+            research_question="Test question",
+            gathered_information=[{"query": "test query", "result": "test result"}],
+            iteration_count=2
+        )
+        orchestrator.research_agent.research = Mock(return_value=state)
+        orchestrator.draft_agent.draft_answer = Mock(return_value="draft")
+        orchestrator.draft_agent.revise_answer = Mock(side_effect=["better draft", "worse draft"])
+        scores = {"draft": 0.4, "better draft": 0.7, "worse draft": 0.5}
+        orchestrator.quality_agent.check_content = Mock(
+            side_effect=lambda content, sources, mode="full": QualityCheck(fact_accuracy=scores[content])
+        )
+
+        timings, reports = {}, {}
+        answer, quality_check = orchestrator.run_research("Test question", stage_timings=timings, reports=reports)
+        assert answer == "better draft"
+        assert quality_check.fact_accuracy == 0.7
+        assert reports["revision"].stop_reason == "converged"
+        assert "speculation" not in reports
+        assert "revise" in timings
+        assert timings["research_iteration"] == pytest.approx(timings["research"] / 2)
+
+        answer, _ = orchestrator.run_research("Test question", allow_revision=False)
+        assert answer == "draft"
+        assert orchestrator.draft_agent.revise_answer.call_count == 2
+
+def test_graph_revise_node_uses_quality_loop(mock_gemini, mock_tavily):
+    """Test that the graph's revise node only revises drafts that fail the checks."""
+    with patch('kairon.research_agent.TavilyClient', return_value=mock_tavily):
+        orchestrator = ResearchOrchestrator()
+        state = ResearchState(research_question="Test question")
+        orchestrator.draft_agent.revise_answer = Mock(return_value="revised")
+        orchestrator.quality_agent.check_content = Mock(return_value=QualityCheck(fact_accuracy=0.9))
+
+        result = orchestrator._revise_answer({"draft": "good draft", "research_state": state})
+        assert result["final_answer"] == "good draft"
+        assert orchestrator.draft_agent.revise_answer.call_count == 0
+
+def test_orchestrator_close_releases_context_cache(mock_gemini, mock_tavily):
+    """Test that closing the orchestrator deletes its provider-side prompt caches."""
+    context_cache = Mock()
+    with patch('kairon.research_agent.TavilyClient', return_value=mock_tavily), \
+         patch('langchain_google_genai.ChatGoogleGenerativeAI', return_value=mock_gemini):
+        orchestrator = ResearchOrchestrator(context_cache=context_cache)
+    orchestrator.close()
+    context_cache.close.assert_called_once()
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
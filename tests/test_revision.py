@@ -0,0 +1,87 @@
+from unittest.mock import Mock
+from kairon.quality_agent import QualityCheck
+from kairon.revision import (
+    DEFAULT_FEEDBACK,
+    RevisionPolicy,
+    feedback_for,
+    quality_score,
+    revise_until_converged,
+)
+
+
+def scripted(scores):
+    """Build revise/check callables where revision n scores scores[n - 1]."""
+    revise = Mock(side_effect=lambda draft, feedback: f"revision {revise.call_count}")
+    check = Mock(
+        side_effect=lambda draft: QualityCheck(
+            fact_accuracy=scores[int(draft.split()[-1]) - 1], issues=["still vague"]
+        )
+    )
+    return revise, check
+
+
+def test_stops_when_target_reached():
+    """Test that a draft already at the target is not revised."""
+    revise, check = scripted([])
+    outcome = revise_until_converged(
+        "draft", QualityCheck(fact_accuracy=0.8), revise, check, RevisionPolicy()
+    )
+    assert outcome.stop_reason == "target"
+    assert outcome.revisions == 0
+    assert revise.call_count == 0
+
+
+def test_revises_until_target():
+    """Test that revision continues while it improves and stops at the target."""
+    revise, check = scripted([0.5, 0.75, 0.9])
+    policy = RevisionPolicy(max_revisions=5, target_score=0.7, epsilon=0.02)
+    outcome = revise_until_converged(
+        "draft", QualityCheck(fact_accuracy=0.3), revise, check, policy
+    )
+    assert outcome.stop_reason == "target"
+    assert outcome.draft == "revision 2"
+    assert outcome.scores == [0.3, 0.5, 0.75]
+    assert revise.call_args.args[1] == "still vague"
+
+
+def test_stops_on_convergence_and_keeps_best_draft():
+    """Test that a revision that stops helping ends the loop and the best draft wins."""
+    revise, check = scripted([0.6, 0.55, 0.9])
+    policy = RevisionPolicy(max_revisions=5, target_score=0.8, epsilon=0.02)
+    outcome = revise_until_converged(
+        "draft", QualityCheck(fact_accuracy=0.4), revise, check, policy
+    )
+    assert outcome.stop_reason == "converged"
+    assert outcome.revisions == 2
+    assert outcome.draft == "revision 1"
+    assert outcome.quality_check.fact_accuracy == 0.6
+    assert outcome.drafts == ["revision 1", "revision 2"]
+
+
+def test_stops_when_budget_spent():
+    """Test the revision budget, including a zero budget."""
+    revise, check = scripted([0.4, 0.5, 0.6])
+    initial = QualityCheck(fact_accuracy=0.3)
+    assert (
+        revise_until_converged(
+            "draft", initial, revise, check, RevisionPolicy(max_revisions=0)
+        ).stop_reason
+        == "budget"
+    )
+    outcome = revise_until_converged(
+        "draft",
+        initial,
+        revise,
+        check,
+        RevisionPolicy(max_revisions=2, target_score=0.9),
+    )
+    assert outcome.stop_reason == "budget"
+    assert outcome.draft == "revision 2"
+
+
+def test_bias_is_penalized():
+    """Test that biased drafts score below the default target and unbiased drafts."""
+    biased = QualityCheck(fact_accuracy=1.0, bias_detected=True)
+    assert quality_score(biased) < RevisionPolicy().target_score
+    assert quality_score(biased) < quality_score(QualityCheck(fact_accuracy=0.6))
+    assert feedback_for(QualityCheck()) == DEFAULT_FEEDBACK
@@ -0,0 +1,188 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from kairon.quality_agent import QualityCheck
+from kairon.scheduler import DegradationPlan, Priority, ResearchScheduler
+
+ESTIMATES = {
+    "research_iteration": 1.0,
+    "draft": 1.0,
+    "quality_full": 1.0,
+    "quality_single": 0.5,
+    "revise": 1.0,
+}
+
+
+class FakeOrchestrator:
+    """Records the order and plans of the jobs it runs."""
+
+    def __init__(self, seconds=0.05, gate=None, iterations_run=None):
+        self.seconds = seconds
+        self.gate = gate
+        self.iterations_run = iterations_run
+        self.calls = []
+        self.archive_options = []
+        self.lock = threading.Lock()
+
+    def run_research(
+        self,
+        question,
+        max_iterations,
+        allow_revision,
+        quality_mode,
+        reuse_archived,
+        archive_max_age,
+        stage_timings,
+    ):
+        if self.gate is not None:
+            self.gate.wait()
+        with self.lock:
+            self.calls.append((question, max_iterations, allow_revision, quality_mode))
+            self.archive_options.append((reuse_archived, archive_max_age))
+        time.sleep(self.seconds)
+        iterations = min(max_iterations, self.iterations_run or max_iterations)
+        stage_timings.update(
+            {
+                "research": self.seconds * iterations,
+                "research_iteration": self.seconds,
+                "draft": self.seconds,
+                "quality": self.seconds,
+            }
+        )
+        return f"answer to {question}", QualityCheck(fact_accuracy=0.9)
+
+
+def test_rejects_invalid_configuration():
+    """Test that batch work always keeps at least one worker."""
+    with pytest.raises(ValueError):
+        ResearchScheduler(FakeOrchestrator(), workers=1, reserved_interactive=1)
+
+
+def test_plan_degrades_to_fit_deadline():
+    """Test the degradation ladder for shrinking deadlines."""
+    scheduler = ResearchScheduler(
+        Mock(), workers=1, reserved_interactive=0, estimates=ESTIMATES
+    )
+    try:
+        assert scheduler.plan(None) == DegradationPlan(max_iterations=3)
+        assert scheduler.plan(100.0, now=94.0) == DegradationPlan(max_iterations=3)
+        assert scheduler.plan(100.0, now=95.0) == DegradationPlan(
+            max_iterations=3, allow_revision=False
+        )
+        assert scheduler.plan(100.0, now=95.5) == DegradationPlan(
+            max_iterations=3, allow_revision=False, quality_mode="single"
+        )
+        assert scheduler.plan(100.0, now=97.0) == DegradationPlan(
+            max_iterations=1, allow_revision=False, quality_mode="single"
+        )
+        assert scheduler.plan(100.0, now=120.0).max_iterations == 1
+    finally:
+        scheduler.shutdown()
+
+
+def test_interactive_jobs_run_before_queued_batch():
+    """Test that interactive jobs jump ahead of earlier batch submissions."""
+    gate = threading.Event()
+    orchestrator = FakeOrchestrator(seconds=0.01, gate=gate)
+    scheduler = ResearchScheduler(orchestrator, workers=2, reserved_interactive=1)
+    batch = [scheduler.submit(f"batch {i}") for i in range(3)]
+    interactive = scheduler.submit("interactive", priority=Priority.INTERACTIVE)
+    gate.set()
+
+    assert interactive.result(timeout=5)[0] == "answer to interactive"
+    for future in batch:
+        future.result(timeout=5)
+    scheduler.shutdown()
+
+    order = [call[0] for call in orchestrator.calls]
+    # One batch job may already hold the batch worker; the rest queue behind interactive
+    assert order.index("interactive") <= 1
+
+
+def test_archive_reuse_options_reach_the_orchestrator():
+    """Test that each job carries its own archive reuse settings."""
+    orchestrator = FakeOrchestrator(seconds=0.0)
+    scheduler = ResearchScheduler(orchestrator, workers=1, reserved_interactive=0)
+    scheduler.submit("fresh", reuse_archived=False).result(timeout=5)
+    scheduler.submit("recent", archive_max_age=60.0).result(timeout=5)
+    scheduler.shutdown()
+
+    assert orchestrator.archive_options == [(False, None), (True, 60.0)]
+
+
+def test_reserved_worker_never_runs_batch():
+    """Test that batch jobs are limited to the unreserved workers."""
+    orchestrator = FakeOrchestrator(seconds=0.05)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    run = orchestrator.run_research
+
+    def tracked(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            return run(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    orchestrator.run_research = tracked
+    scheduler = ResearchScheduler(orchestrator, workers=3, reserved_interactive=1)
+    futures = [scheduler.submit(f"batch {i}") for i in range(6)]
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.shutdown()
+    assert peak[0] == 2
+
+
+def test_deadline_jobs_are_degraded_and_tracked():
+    """Test degraded execution and deadline statistics."""
+    orchestrator = FakeOrchestrator(seconds=0.01)
+    scheduler = ResearchScheduler(orchestrator, workers=2, estimates=ESTIMATES)
+    scheduler.submit("urgent", priority=Priority.INTERACTIVE, deadline=2.0).result(
+        timeout=5
+    )
+    scheduler.submit("backfill").result(timeout=5)
+    scheduler.shutdown()
+
+    calls = {call[0]: call[1:] for call in orchestrator.calls}
+    assert calls["urgent"] == (1, False, "single")
+    assert calls["backfill"] == (3, True, "full")
+
+    stats = scheduler.stats()
+    assert stats["interactive"].completed == 1
+    assert stats["interactive"].degraded == 1
+    assert stats["interactive"].deadline_misses == 0
+    assert stats["interactive"].p95_seconds is not None
+    assert stats["batch"].degraded == 0
+
+
+def test_estimates_learn_from_observed_timings():
+    """Test that estimates move toward observed durations per iteration actually run."""
+    orchestrator = FakeOrchestrator(seconds=0.01, iterations_run=1)
+    scheduler = ResearchScheduler(
+        orchestrator, workers=1, reserved_interactive=0, smoothing=1.0
+    )
+    scheduler.submit("question").result(timeout=5)
+    scheduler.shutdown()
+    assert scheduler.estimates["research_iteration"] == pytest.approx(0.01)
+    assert scheduler.estimates["draft"] == pytest.approx(0.01)
+    assert scheduler.estimates["revise"] == 8.0
+
+
+def test_failures_propagate_and_shutdown_rejects_jobs():
+    """Test error propagation and submission after shutdown."""
+    orchestrator = Mock()
+    orchestrator.run_research.side_effect = RuntimeError("quota exceeded")
+    scheduler = ResearchScheduler(orchestrator, workers=1, reserved_interactive=0)
+    with pytest.raises(RuntimeError):
+        scheduler.submit("question").result(timeout=5)
+    assert scheduler.stats()["batch"].failed == 1
+
+    scheduler.shutdown()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("question")
+    with pytest.raises(ValueError):
+        ResearchScheduler(orchestrator, workers=1, reserved_interactive=0).submit("")
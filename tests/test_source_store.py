@@ -0,0 +1,69 @@
+import pytest
+from kairon.source_store import SourceStore, SpilledText, format_sources
+
+
+def test_add_deduplicates_passages():
+    """Test that identical passages share one stored copy."""
+    store = SourceStore()
+    first = store.add("quantum " * 100)
+    second = store.add("quantum " * 100)
+    assert first is second
+    assert len(store) == 1
+    assert store.memory_bytes == len("quantum " * 100)
+
+
+def test_intern_returns_shared_string():
+    """Test that repeated queries are interned."""
+    store = SourceStore()
+    query = "".join(["What is ", "quantum computing?"])
+    assert store.intern(query) is store.intern("What is quantum computing?")
+
+
+def test_passages_spill_beyond_threshold():
+    """Test that passages over the memory budget are spilled to disk."""
+    store = SourceStore(spill_threshold=10)
+    in_memory = store.add("short")
+    spilled = store.add("a longer passage that does not fit in memory")
+    unicode_spilled = store.add("qubits → cohérence")
+
+    assert in_memory == "short"
+    assert isinstance(spilled, SpilledText)
+    assert str(spilled) == "a longer passage that does not fit in memory"
+    assert str(unicode_spilled) == "qubits → cohérence"
+    assert f"{spilled}" == str(spilled)
+    assert store.memory_bytes == 5
+    assert store.spilled_bytes > 0
+    store.close()
+
+
+def test_spilled_passages_remain_readable_after_growth():
+    """Test reading earlier passages after the spill file grows."""
+    store = SourceStore(spill_threshold=0)
+    first = store.add("first passage")
+    assert str(first) == "first passage"
+    second = store.add("second passage")
+    assert str(first) == "first passage"
+    assert str(second) == "second passage"
+    store.close()
+
+
+def test_format_sources():
+    """Test single-pass source formatting."""
+    store = SourceStore(spill_threshold=0)
+    sources = [
+        {"query": "q1", "result": store.add("spilled result")},
+        {"source": "https://example.com", "content": "test content"},
+    ]
+    formatted = format_sources(sources)
+    assert "query: q1\nresult: spilled result" in formatted
+    assert "content: test content" in formatted
+    assert "SpilledText" not in formatted
+    store.close()
+
+
+
+def test_store_without_threshold_never_spills():
+    """Test that a store with no threshold keeps every passage in memory."""
+    store = SourceStore(spill_threshold=None)
+    assert store.add("x" * 1024) == "x" * 1024
+    assert store.spilled_bytes == 0
@@ -0,0 +1,106 @@
+import time
+import pytest
+from unittest.mock import Mock
+from kairon.research_agent import ResearchState
+from kairon.speculative import SpeculativeDrafter, novelty
+
+
+def make_research(results, delay=0.0):
+    """Build a fake research loop that yields one finding per iteration."""
+
+    def research(on_iteration):
+        state = ResearchState(research_question="Test question")
+        for i, result in enumerate(results):
+            time.sleep(delay)
+            state.gathered_information.append({"query": f"q{i}", "result": result})
+            state.iteration_count += 1
+            on_iteration(state)
+        return state
+
+    return research
+
+
+def make_draft_agent(delay=0.0):
+    """Build a fake draft agent that reports how many sources it used."""
+    agent = Mock()
+
+    def draft_answer(state):
+        time.sleep(delay)
+        return f"draft from {len(state.gathered_information)} sources"
+
+    agent.draft_answer.side_effect = draft_answer
+    agent.revise_answer.side_effect = lambda draft, feedback: f"{draft} (revised)"
+    agent._format_information.side_effect = lambda info: str(info)
+    return agent
+
+
+def test_novelty():
+    """Test vocabulary novelty of new findings."""
+    known = [{"result": "qubits coherence error correction"}]
+    assert novelty([{"result": "qubits coherence"}], known) == 0.0
+    assert novelty([{"result": "photonic chips"}], known) == 1.0
+    assert novelty([], known) == 0.0
+
+
+def test_repeated_findings_keep_first_draft():
+    """Test that findings with nothing new leave the speculative draft as is."""
+    agent = make_draft_agent(delay=0.05)
+    research = make_research(["qubits coherence times"] * 3, delay=0.05)
+
+    state, draft, report = SpeculativeDrafter(agent).run(research)
+    assert len(state.gathered_information) == 3
+    assert draft == "draft from 1 sources"
+    assert report.final_action == "keep"
+    assert agent.draft_answer.call_count == 1
+    agent.revise_answer.assert_not_called()
+
+
+def test_small_novelty_revises_incrementally():
+    """Test that moderately new findings revise the draft."""
+    agent = make_draft_agent()
+    research = make_research(
+        [
+            "qubits coherence times improved error correction logical",
+            "qubits coherence times improved error correction photonic",
+        ]
+    )
+
+    state, draft, report = SpeculativeDrafter(
+        agent, keep_threshold=0.1, restart_threshold=0.5
+    ).run(research)
+    assert draft == "draft from 1 sources (revised)"
+    assert report.final_action == "revise"
+
+
+def test_large_novelty_restarts_draft():
+    """Test that substantially new findings discard the speculative draft."""
+    agent = make_draft_agent(delay=0.05)
+    research = make_research(["qubits coherence", "bananas potassium"])
+
+    state, draft, report = SpeculativeDrafter(agent).run(research)
+    assert draft == "draft from 2 sources"
+    assert report.drafts_discarded >= 1
+    assert report.final_action == "redraft"
+
+
+def test_report_measures_saved_latency():
+    """Test that overlapping drafting with research saves wall time."""
+    agent = make_draft_agent(delay=0.2)
+    research = make_research(["qubits coherence"] * 3, delay=0.1)
+
+    _, _, report = SpeculativeDrafter(agent).run(research)
+    assert report.sequential_estimate_seconds == pytest.approx(
+        report.research_seconds + 0.2, abs=0.05
+    )
+    assert report.saved_seconds > 0.1
+    assert report.wall_seconds < report.sequential_estimate_seconds
+
+
+def test_draft_errors_propagate():
+    """Test that a failing speculative draft surfaces to the caller."""
+    agent = make_draft_agent()
+    agent.draft_answer.side_effect = ValueError(
+        "No research information available to draft from"
+    )
+    with pytest.raises(ValueError):
+        SpeculativeDrafter(agent).run(make_research(["qubits"]))